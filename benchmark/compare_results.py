@@ -0,0 +1,72 @@
+import argparse
+import json
+import sys
+
+# Relative change beyond which a metric counts as a regression
+THRESHOLD = 0.10
+# Metrics compared per stage, and whether a higher value is better
+METRICS = {
+    'rows_per_s': True,
+    'mb_per_s': True,
+    'wall_time_s': False,
+    'peak_rss_mb': False,
+}
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """
+    Compare two results files of pipeline_benchmark.py stage by stage.
+
+    Args:
+        baseline (dict): Results of the reference run
+        current (dict): Results of the run under test
+        threshold (float): Relative change tolerated before a metric is flagged
+
+    Returns:
+        list: (stage, metric, baseline value, current value, relative change, regressed)
+            for every metric of the stages present in both runs
+    """
+    rows = []
+    for stage, before in baseline['stages'].items():
+        after = current['stages'].get(stage)
+        if after is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = before.get(metric), after.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = -change > threshold if higher_is_better else change > threshold
+            rows.append((stage, metric, old, new, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag regressions between two pipeline benchmark runs")
+    parser.add_argument('baseline', help="Results file of the reference run")
+    parser.add_argument('current', help="Results file of the run under test")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="Relative change flagged as a regression (default: %(default)s)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline.get('settings') != current.get('settings'):
+        print(f"⚠️ Runs used different settings: {baseline.get('settings')} vs {current.get('settings')}")
+
+    rows = compare(baseline, current, args.threshold)
+    for stage, metric, old, new, change, regressed in rows:
+        flag = 'REGRESSION' if regressed else ''
+        print(f"{stage:<20} {metric:<12} {old:>14} {new:>14} {change:>+8.1%}  {flag}")
+
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print(f"❌ {len(regressions)} regressions beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print("✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# The pipeline code lives in loose script directories, not packages
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+for directory in ('generate', os.path.join('db', 'scripts'), os.path.join('hadoop', 'scripts')):
+    sys.path.append(os.path.join(ROOT, directory))
+
+# 🔥 CONFIGURATION
+# A scratch database with db/schema/source.sql applied: every run truncates its tables
+DB_CONFIG = {
+    'host': 'localhost',
+    'port': 5432,
+    'dbname': 'benchmark',
+    'user': 'user',
+    'password': 'password'
+}
+SCALE_FACTOR = 1
+CHUNK_SIZE = 500000
+SEED = 0
+MAX_WORKERS = 4
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+# Required by the exporters' signatures, unused with a LocalSink
+LOCAL_CONTAINER = 'local'
+LOCAL_TEMP_DIR = '/tmp'
+# Sink directories of the two exporters, below the local sink root
+EXPORT_PATHS = {'export_el_to_hdfs': '/benchmark/el_to_hdfs', 'export_el_dwh': '/benchmark/el_dwh'}
+
+
+def _directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path) for name in files
+    )
+
+
+def _peak_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    return peak * unit
+
+
+def _source_rows(settings):
+    from scaled_source import SourceDataGenerator, TABLES
+
+    generator = SourceDataGenerator(settings['scale_factor'], settings['chunk_size'], settings['seed'])
+    return {table: generator.row_count(table) for table in TABLES}
+
+
+def stage_generate(settings):
+    """Generate the source tables as CSV files"""
+    from scaled_source import SourceDataGenerator, TABLES
+
+    os.makedirs(settings['csv_dir'], exist_ok=True)
+    generator = SourceDataGenerator(settings['scale_factor'], settings['chunk_size'], settings['seed'])
+    rows = sum(generator.write_csv(table, os.path.join(settings['csv_dir'], f"{table}.csv")) for table in TABLES)
+    return rows, _directory_size(settings['csv_dir'])
+
+
+def stage_load(settings):
+    """Load the generated CSV files with DatabaseLoader"""
+    from load import DatabaseLoader
+    from to_source import TABLES
+
+    loader = DatabaseLoader(settings['db_config'], TABLES, settings['csv_dir'], settings['max_workers'])
+    if not loader.load_data():
+        raise RuntimeError("DatabaseLoader reported failed tables")
+    return sum(settings['rows'].values()), _directory_size(settings['csv_dir'])
+
+
+def _check_statuses(results):
+    failed = {table: status for table, status in results.items() if status.lower().startswith('failed')}
+    if failed:
+        raise RuntimeError(f"Export failed: {failed}")
+
+
+def stage_export_el_to_hdfs(settings):
+    """Full export with EL_to_hdfs.PostgresToHdfsExporter into a LocalSink"""
+    from EL_to_hdfs import PostgresToHdfsExporter
+    from sinks import LocalSink
+
+    path = EXPORT_PATHS['export_el_to_hdfs']
+    exporter = PostgresToHdfsExporter(
+        pg_config=settings['db_config'],
+        hdfs_path=path,
+        tables=list(settings['rows']),
+        hdfs_container=LOCAL_CONTAINER,
+        container_temp_dir=LOCAL_TEMP_DIR,
+        max_workers=settings['max_workers'],
+        watermark_path=os.path.join(settings['work_dir'], 'watermarks.json'),
+        checkpoint_path=os.path.join(settings['work_dir'], 'chunk_checkpoints.json'),
+        sink=LocalSink(settings['sink_dir'])
+    )
+    _check_statuses(exporter.export_tables(incremental=False))
+    return sum(settings['rows'].values()), _directory_size(os.path.join(settings['sink_dir'], path.lstrip('/')))
+
+
+def stage_export_el_dwh(settings):
+    """Streaming export with EL_dwh.PostgresToHdfsExporter into a LocalSink"""
+    from EL_dwh import PostgresToHdfsExporter
+    from sinks import LocalSink
+
+    path = EXPORT_PATHS['export_el_dwh']
+    exporter = PostgresToHdfsExporter(
+        pg_config=settings['db_config'],
+        hdfs_path=path,
+        tables=list(settings['rows']),
+        hdfs_container=LOCAL_CONTAINER,
+        container_temp_dir=LOCAL_TEMP_DIR,
+        streaming=True,
+        max_workers=settings['max_workers'],
+        sink=LocalSink(settings['sink_dir']),
+        checkpoint_path=os.path.join(settings['work_dir'], 'dwh_chunk_checkpoints.json')
+    )
+    _check_statuses(exporter.export_tables())
+    return sum(settings['rows'].values()), _directory_size(os.path.join(settings['sink_dir'], path.lstrip('/')))
+
+
+STAGES = [
+    ('generate', stage_generate),
+    ('load', stage_load),
+    ('export_el_to_hdfs', stage_export_el_to_hdfs),
+    ('export_el_dwh', stage_export_el_dwh),
+]
+
+
+def _stage_process(function, settings, connection):
+    # Runs in a fresh process, so ru_maxrss is the peak of this stage alone
+    os.chdir(settings['work_dir'])
+    try:
+        start = time.perf_counter()
+        rows, size = function(settings)
+        wall_time = time.perf_counter() - start
+        connection.send({'rows': rows, 'bytes': size, 'wall_time_s': wall_time, 'peak_rss_bytes': _peak_rss_bytes()})
+    except Exception as e:
+        connection.send({'error': f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def run_stage(name, function, settings):
+    """
+    Run one stage in its own process and measure it.
+
+    Each stage starts from a fresh interpreter, so its peak RSS is not hidden
+    by an earlier, hungrier stage. The Postgres server's own memory is not
+    included.
+
+    Returns:
+        dict: rows, bytes, wall_time_s, rows_per_s, mb_per_s and peak_rss_mb
+
+    Raises:
+        RuntimeError: If the stage fails
+    """
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_stage_process, args=(function, settings, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {'error': 'stage process died'}
+    process.join()
+    if 'error' in result:
+        raise RuntimeError(f"Stage {name} failed: {result['error']}")
+
+    wall_time = result['wall_time_s']
+    return {
+        'rows': result['rows'],
+        'bytes': result['bytes'],
+        'wall_time_s': round(wall_time, 3),
+        'rows_per_s': round(result['rows'] / wall_time, 1),
+        'mb_per_s': round(result['bytes'] / 1e6 / wall_time, 3),
+        'peak_rss_mb': round(result['peak_rss_bytes'] / 1e6, 1),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(scale_factor=SCALE_FACTOR, db_config=DB_CONFIG, chunk_size=CHUNK_SIZE, seed=SEED,
+                  max_workers=MAX_WORKERS, work_dir=None, stages=None):
+    """
+    Generate, load and export a dataset at a scale factor, timing each stage.
+
+    Args:
+        scale_factor (float): Size of the dataset, see generate/scaled_source.py
+        db_config (dict): psycopg2 parameters of a scratch database with the source schema
+        chunk_size (int): Rows generated per batch
+        seed (int): Generator seed
+        max_workers (int): Workers of the loader and of both exporters
+        work_dir (str): Directory for the CSV files and the sink; a temporary
+            directory, removed afterwards, if None
+        stages (list): Names of the stages to run, all of STAGES if None
+
+    Returns:
+        dict: Run settings and per-stage measurements, as written to the results file
+    """
+    keep = work_dir is not None
+    work_dir = os.path.abspath(work_dir or tempfile.mkdtemp(prefix='pipeline_benchmark_'))
+    os.makedirs(work_dir, exist_ok=True)
+    settings = {
+        'scale_factor': scale_factor,
+        'db_config': db_config,
+        'chunk_size': chunk_size,
+        'seed': seed,
+        'max_workers': max_workers,
+        'work_dir': work_dir,
+        'csv_dir': os.path.join(work_dir, 'csv'),
+        'sink_dir': os.path.join(work_dir, 'sink'),
+    }
+    settings['rows'] = _source_rows(settings)
+
+    results = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'host': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'settings': {key: settings[key] for key in ('scale_factor', 'chunk_size', 'seed', 'max_workers')},
+        'stages': {},
+    }
+    try:
+        for name, function in STAGES:
+            if stages and name not in stages:
+                continue
+            print(f"🔥 Running stage {name}...")
+            results['stages'][name] = run_stage(name, function, settings)
+            stage = results['stages'][name]
+            print(f"   {stage['rows']} rows in {stage['wall_time_s']}s: {stage['rows_per_s']} rows/s, "
+                  f"{stage['mb_per_s']} MB/s, peak RSS {stage['peak_rss_mb']} MB")
+    finally:
+        if not keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generation, loading and export of the source dataset")
+    parser.add_argument('--scale-factor', type=float, default=SCALE_FACTOR)
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--stages', nargs='+', choices=[name for name, _ in STAGES],
+                        help="Stages to run; later stages need the data of the earlier ones")
+    parser.add_argument('--work-dir', help="Keep the generated files and exports in this directory")
+    parser.add_argument('--output', help="Results file; defaults to a timestamped file in benchmark/results")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.scale_factor, max_workers=args.workers, work_dir=args.work_dir, stages=args.stages)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_sf{args.scale_factor:g}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import csv
+
+
+class CsvValidationError(ValueError):
+    pass
+
+
+class ValidatingCsvStream:
+    def __init__(self, f, expected_columns, chunk_size=64 * 1024):
+        """
+        File object for copy_expert that checks field counts while COPY reads.
+
+        Rows are parsed with csv.reader as they pass through, and the original
+        text is handed on unchanged, so the file is read once and COPY still
+        does the actual parsing. A row with the wrong number of fields raises
+        CsvValidationError from read(), which aborts the COPY.
+
+        Args:
+            f: Text file opened with newline=''
+            expected_columns (int): Number of fields every row must have
+            chunk_size (int): Minimum amount of text returned per read() call
+        """
+        self.expected_columns = expected_columns
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self._raw = []
+        self._reader = csv.reader(self._capture(f))
+        self._pending = ''
+
+    def _capture(self, f):
+        # csv.reader may pull several physical lines for one quoted row
+        for line in f:
+            self._raw.append(line)
+            yield line
+
+    def _check(self, row):
+        if len(row) == self.expected_columns:
+            return
+        # The header is row 0
+        if self.rows == 0:
+            raise CsvValidationError(f"CSV has {len(row)} columns, expected {self.expected_columns}")
+        raise CsvValidationError(
+            f"Row {self.rows} (line {self._reader.line_num}) has {len(row)} columns, "
+            f"expected {self.expected_columns}"
+        )
+
+    def read(self, size=-1):
+        wanted = max(size, self.chunk_size) if size >= 0 else -1
+        chunks = [self._pending]
+        length = len(self._pending)
+        while wanted < 0 or length < wanted:
+            try:
+                row = next(self._reader)
+            except StopIteration:
+                break
+            self._check(row)
+            self.rows += 1
+            text = ''.join(self._raw)
+            self._raw.clear()
+            chunks.append(text)
+            length += len(text)
+        data = ''.join(chunks)
+        if size < 0:
+            self._pending = ''
+            return data
+        self._pending = data[size:]
+        return data[:size]
@@ -0,0 +1,60 @@
+def foreign_key_dependencies(cursor, tables):
+    """
+    Read which of the given tables reference which others through foreign keys.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        tables (list): Table names in the current schema
+
+    Returns:
+        dict: Table name -> set of the tables it references, limited to the
+            given tables and without self references
+    """
+    cursor.execute(
+        """
+        SELECT DISTINCT child.relname, parent.relname
+        FROM pg_constraint con
+        JOIN pg_class child ON child.oid = con.conrelid
+        JOIN pg_class parent ON parent.oid = con.confrelid
+        JOIN pg_namespace n ON n.oid = child.relnamespace
+        WHERE con.contype = 'f'
+          AND n.nspname = current_schema()
+          AND child.relname = ANY(%s)
+          AND parent.relname = ANY(%s)
+        """,
+        (list(tables), list(tables))
+    )
+    dependencies = {table: set() for table in tables}
+    for child, parent in cursor.fetchall():
+        if child != parent:
+            dependencies[child].add(parent)
+    return dependencies
+
+
+def load_order(dependencies):
+    """
+    Order tables so every table comes after the tables it references.
+
+    Ties keep the order of the dependencies dict.
+
+    Args:
+        dependencies (dict): Table name -> set of referenced tables
+
+    Returns:
+        list: Table names, parents first
+
+    Raises:
+        ValueError: If the foreign keys form a cycle
+    """
+    remaining = {table: set(parents) for table, parents in dependencies.items()}
+    order = []
+    while remaining:
+        ready = [table for table, parents in remaining.items() if not parents]
+        if not ready:
+            raise ValueError(f"Foreign key cycle between tables: {', '.join(sorted(remaining))}")
+        for table in ready:
+            del remaining[table]
+            order.append(table)
+        for parents in remaining.values():
+            parents.difference_update(ready)
+    return order
@@ -0,0 +1,20 @@
+import os
+import sys
+
+from load import DatabaseLoader
+from to_dwh import DB_CONFIG, TABLES, MAX_WORKERS, EXTRACTION_DIR
+
+# The generators live in generate/ at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'generate'))
+from dwh_facts import load_parts
+
+# Generation settings for fact_reservations; dimensions come from dummy_dwh.py CSVs
+NUM_RESERVATIONS = 50000
+CHUNK_SIZE = 100000
+WORKERS = os.cpu_count()
+if __name__ == '__main__':
+    dimensions = [(table, columns) for table, columns in TABLES if table != 'fact_reservations']
+    loader = DatabaseLoader(DB_CONFIG, dimensions, EXTRACTION_DIR, MAX_WORKERS)
+    if loader.load_data():
+        rows = load_parts(DB_CONFIG, NUM_RESERVATIONS, CHUNK_SIZE, WORKERS)
+        print(f"Successfully loaded {rows} generated rows into fact_reservations")
\ No newline at end of file
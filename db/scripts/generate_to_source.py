@@ -0,0 +1,19 @@
+import os
+import sys
+
+from load import GeneratedDataLoader
+from to_source import DB_CONFIG, TABLES, MAX_WORKERS
+
+# The generators live in generate/ at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'generate'))
+from scaled_source import SourceDataGenerator
+
+# Generation settings
+SCALE_FACTOR = 1
+CHUNK_SIZE = 500000
+SEED = 0
+
+if __name__ == '__main__':
+    generator = SourceDataGenerator(SCALE_FACTOR, CHUNK_SIZE, SEED)
+    loader = GeneratedDataLoader(DB_CONFIG, TABLES, generator, MAX_WORKERS)
+    loader.load_data()
@@ -1,13 +1,45 @@
 import os
+import sys
 import csv
+import time
 import psycopg2
 from psycopg2 import sql
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Stage metrics and catalog lookups are shared with the exporters in hadoop/scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'hadoop', 'scripts'))
+from stage_metrics import CountingReader, StageMetrics
+from profiling import TableProfiler
+
+from csv_stream import ValidatingCsvStream
+from fk_graph import foreign_key_dependencies, load_order
+from merge import create_delta_table, merge_delta
+from shadow_swap import create_shadow, swap_in, validate_foreign_keys
 
 class DatabaseLoader:
-    def __init__(self, db_config, tables, csv_dir):
+    def __init__(self, db_config, tables, csv_dir, max_workers=4, validation='stream', shadow_swap=False,
+                 merge=False, merge_newer_column=None, metrics=None, profile_dir=None):
         self.db_config = db_config
         self.tables = tables
         self.csv_dir = csv_dir
+        self.max_workers = max_workers
+        # 'stream' checks rows as COPY reads them, 'full' reads each file
+        # once up front before loading it, None loads without checking
+        self.validation = validation
+        # Load into an UNLOGGED copy and swap it in, instead of TRUNCATE + COPY
+        self.shadow_swap = shadow_swap
+        # Upsert the CSV files as deltas on each table's primary key instead;
+        # with merge_newer_column (e.g. 'updated_at') only newer rows overwrite
+        self.merge = merge
+        self.merge_newer_column = merge_newer_column
+        if merge and shadow_swap:
+            raise ValueError("merge and shadow_swap are mutually exclusive")
+        # Per-table stage timings; pass a StageMetrics with output paths to get JSON lines / a .prom file
+        self.metrics = metrics or StageMetrics('load')
+        # Per-table cProfile, flamegraph stacks and tracemalloc reports when a directory is given
+        self.profiler = TableProfiler(profile_dir)
+        # {table: {'loaded': bool, 'stages': {...}}} of the last load_data
+        self.results = {}
 
     def validate_csv(self, file_path, expected_columns):
 
@@ -30,54 +62,154 @@ class DatabaseLoader:
             print(f"Validation error: {e}")
             return False
 
-    def load_table(self, cursor, table, expected_columns):
-        """Load a single table"""
+    def open_source(self, table, expected_columns):
+        """Open the CSV data of a table, or return None if it cannot be loaded"""
         csv_path = os.path.join(self.csv_dir, f'{table}.csv')
         if not os.path.exists(csv_path):
             print(f"Error: Missing CSV file for {table}")
-            return False
+            return None
             
-        if not self.validate_csv(csv_path, expected_columns):
+        if self.validation == 'full' and not self.validate_csv(csv_path, expected_columns):
             print(f"Skipping {table} due to validation errors")
+            return None
+        return open(csv_path, 'r', newline='')
+
+    def _copy_csv(self, cursor, table, f, expected_columns, metrics_table=None):
+        # Load data with proper NULL handling
+        if self.validation == 'stream':
+            # A bad row aborts the COPY, which rolls back the whole load
+            f = ValidatingCsvStream(f, expected_columns)
+        f = CountingReader(f)
+        with self.metrics.stage(metrics_table or table, 'copy') as counts:
+            cursor.copy_expert(
+                sql.SQL("COPY {} FROM STDIN WITH CSV HEADER NULL ''").format(
+                    sql.Identifier(table)
+                ),
+                f
+            )
+            counts['rows'] = cursor.rowcount
+            counts['bytes'] = f.count
+
+    def load_table(self, cursor, table, expected_columns):
+        """Load a single table"""
+        source = self.open_source(table, expected_columns)
+        if source is None:
             return False
             
         try:
-            # Clear existing data
-            cursor.execute(f"TRUNCATE TABLE {table} CASCADE;")
-            
-            # Load data with proper NULL handling
-            with open(csv_path, 'r') as f:
-                cursor.copy_expert(
-                    sql.SQL("COPY {} FROM STDIN WITH CSV HEADER NULL ''").format(
-                        sql.Identifier(table)
-                    ),
-                    f
-                )
+            if self.merge:
+                delta = create_delta_table(cursor, table)
+                self._copy_csv(cursor, delta, source, expected_columns, table)
+                with self.metrics.stage(table, 'merge') as counts:
+                    merged = counts['rows'] = merge_delta(cursor, table, delta, self.merge_newer_column)
+                print(f"Merged {merged} rows into {table}")
+            elif self.shadow_swap:
+                # Readers keep the old rows until the swap commits
+                shadow = create_shadow(cursor, table)
+                self._copy_csv(cursor, shadow, source, expected_columns, table)
+                with self.metrics.stage(table, 'swap'):
+                    to_validate = swap_in(cursor, table, shadow, [name for name, _ in self.tables])
+                    cursor.connection.commit()
+                with self.metrics.stage(table, 'validate'):
+                    validate_foreign_keys(cursor, to_validate)
+            else:
+                # load_data has already emptied the table
+                self._copy_csv(cursor, table, source, expected_columns)
             print(f"Successfully loaded {table}")
             return True
         except psycopg2.Error as e:
+            cursor.connection.rollback()
             print(f"Error loading {table}: {e.pgerror}")
             return False
+        finally:
+            source.close()
 
-    def load_data(self):
-        """Main method to load all tables"""
+    def _load_table_worker(self, table, expected_columns):
+        """Load a single table over its own connection"""
         conn = None
         try:
             conn = psycopg2.connect(**self.db_config)
             conn.autocommit = False
             cursor = conn.cursor()
-            
+
             # Disable constraints temporarily
             cursor.execute("SET session_replication_role = 'replica';")
-            
-            for table, expected_columns in self.tables:
-                self.load_table(cursor, table, expected_columns)
+            start = time.perf_counter()
+            with self.profiler.profile(table):
+                loaded = self.load_table(cursor, table, expected_columns)
                 conn.commit()
-            
-            # Re-enable constraints and verify
-            cursor.execute("SET session_replication_role = 'origin';")
+            if loaded:
+                self.metrics.record(table, 'total', time.perf_counter() - start)
+            return loaded
+        except Exception as e:
+            print(f"Database error loading {table}: {e}")
+            if conn:
+                conn.rollback()
+            return False
+        finally:
+            if conn:
+                conn.close()
+
+    def _truncate_all(self, cursor, tables):
+        """Empty every table in one TRUNCATE, committed before the workers start"""
+        # A TRUNCATE ... CASCADE per worker would hold ACCESS EXCLUSIVE locks
+        # on the child tables until its load commits and serialize the workers
+        start = time.perf_counter()
+        cursor.execute(
+            sql.SQL("TRUNCATE TABLE {} CASCADE").format(sql.SQL(', ').join(map(sql.Identifier, tables)))
+        )
+        cursor.connection.commit()
+        print(f"Truncated {len(tables)} tables in {time.perf_counter() - start:.2f}s")
+
+    def load_data(self):
+        """Main method to load all tables; per-table stage metrics are kept in self.results"""
+        conn = None
+        try:
+            conn = psycopg2.connect(**self.db_config)
+            conn.autocommit = False
+            cursor = conn.cursor()
+
+            expected = dict(self.tables)
+            self.metrics.reset()
+            self.profiler.start_run('load')
+            dependencies = foreign_key_dependencies(cursor, list(expected))
+            conn.commit()
+            # Fails early on a foreign key cycle
+            order = load_order(dependencies)
+
+            if not self.merge and not self.shadow_swap:
+                self._truncate_all(cursor, order)
+
+            # Workers only COPY, so with foreign key checks off every table can
+            # start at once; a shadow swap validates the child's foreign keys
+            # when it is swapped in, so it still waits for its parents
+            pending = {table: set(dependencies[table]) if self.shadow_swap else set() for table in order}
+            results = {}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                running = {}
+                while pending or running:
+                    for table in [t for t, parents in pending.items() if not parents]:
+                        del pending[table]
+                        running[executor.submit(self._load_table_worker, table, expected[table])] = table
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        table = running.pop(future)
+                        results[table] = future.result()
+                        for parents in pending.values():
+                            parents.discard(table)
+
+            self.results = {
+                table: {'loaded': results[table], 'stages': self.metrics.table(table)} for table in order
+            }
+            self.metrics.write_textfile(results)
+
+            # Verify the connection is still usable after the load
             cursor.execute("SELECT 1")  # Test query
             conn.commit()
+            failed = [table for table in order if not results[table]]
+            if failed:
+                print(f"Failed to load: {', '.join(failed)}")
+                return False
             print("All data loaded with constraints verified")
             return True
             
@@ -87,5 +219,31 @@ class DatabaseLoader:
                 conn.rollback()
             return False
         finally:
+            self.profiler.finish_run()
             if conn:
-                conn.close()
\ No newline at end of file
+                conn.close()
+
+
+class GeneratedDataLoader(DatabaseLoader):
+    def __init__(self, db_config, tables, generator, max_workers=4, **options):
+        """
+        Load tables straight from a data generator, without intermediate CSV files.
+
+        The generator renders each table as CSV while COPY reads it, one chunk
+        at a time, so memory stays bounded by the generator's chunk size. Rows
+        are not validated: the generator writes the table layout itself.
+
+        Args:
+            db_config (dict): psycopg2 connection parameters
+            tables (list): (table, expected_columns) tuples, as in to_source.py
+            generator: Object with open_csv_stream(table, include_header), e.g.
+                SourceDataGenerator from generate/scaled_source.py
+            max_workers (int): Tables loaded in parallel
+            **options: shadow_swap / merge options of DatabaseLoader
+        """
+        super().__init__(db_config, tables, None, max_workers, validation=None, **options)
+        self.generator = generator
+
+    def open_source(self, table, expected_columns):
+        """Open the generated CSV stream of a table"""
+        return self.generator.open_csv_stream(table, include_header=True)
\ No newline at end of file
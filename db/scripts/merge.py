@@ -0,0 +1,89 @@
+from psycopg2 import sql
+
+# Found on sys.path set up by load.py
+from pg_catalog import get_primary_key
+
+
+def table_columns(cursor, table):
+    cursor.execute(
+        """
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+        """,
+        (table,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def create_delta_table(cursor, table):
+    """
+    Create a temporary table shaped like a table, dropped at commit.
+
+    Returns:
+        str: Name of the temporary table
+    """
+    delta = f"{table[:56]}__delta"
+    cursor.execute(
+        sql.SQL("CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP").format(
+            sql.Identifier(delta), sql.Identifier(table)
+        )
+    )
+    return delta
+
+
+def merge_delta(cursor, table, delta, newer_column=None):
+    """
+    Upsert the rows of a delta table into a table on its primary key.
+
+    When a key appears several times in the delta only one row is applied:
+    the newest by newer_column if it is given. With newer_column, existing
+    rows are only overwritten by rows whose value in that column is newer.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        table (str): Target table
+        delta (str): Table holding the incoming rows, same columns as table
+        newer_column (str): Timestamp column deciding which version wins,
+            or None to always apply the incoming rows
+
+    Returns:
+        int: Number of rows inserted or updated
+
+    Raises:
+        ValueError: If the table has no primary key
+    """
+    keys = get_primary_key(cursor, table)
+    if not keys:
+        raise ValueError(f"{table} has no primary key to merge on")
+    columns = table_columns(cursor, table)
+    updates = [column for column in columns if column not in keys]
+
+    column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+    key_list = sql.SQL(', ').join(map(sql.Identifier, keys))
+    order = key_list
+    if newer_column:
+        order = sql.SQL("{}, {} DESC NULLS LAST").format(key_list, sql.Identifier(newer_column))
+
+    if updates:
+        action = sql.SQL("DO UPDATE SET {}").format(sql.SQL(', ').join(
+            sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column)) for column in updates
+        ))
+        if newer_column:
+            action += sql.SQL(" WHERE {0}.{1} IS NULL OR {0}.{1} < EXCLUDED.{1}").format(
+                sql.Identifier(table), sql.Identifier(newer_column)
+            )
+    else:
+        action = sql.SQL("DO NOTHING")
+
+    cursor.execute(
+        sql.SQL(
+            "INSERT INTO {table} ({columns}) "
+            "SELECT DISTINCT ON ({keys}) {columns} FROM {delta} ORDER BY {order} "
+            "ON CONFLICT ({keys}) {action}"
+        ).format(
+            table=sql.Identifier(table), columns=column_list, keys=key_list,
+            delta=sql.Identifier(delta), order=order, action=action
+        )
+    )
+    return cursor.rowcount
@@ -0,0 +1,205 @@
+import re
+from psycopg2 import sql
+
+# Order constraints are rebuilt in: keys before the foreign keys that may use them
+_CONSTRAINT_ORDER = {'p': 0, 'u': 1, 'x': 2, 'c': 3, 'f': 4}
+
+
+def _temp_name(name):
+    # Index names share the schema namespace with the live table's indexes
+    return f"{name[:57]}__load"
+
+
+def create_shadow(cursor, table):
+    """
+    Create an empty UNLOGGED copy of a table, without indexes or constraints.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        table (str): Name of the live table
+
+    Returns:
+        str: Name of the shadow table
+    """
+    shadow = f"{table[:57]}__load"
+    cursor.execute(
+        sql.SQL(
+            "CREATE UNLOGGED TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS)"
+        ).format(sql.Identifier(shadow), sql.Identifier(table))
+    )
+    return shadow
+
+
+def _constraints(cursor, table):
+    cursor.execute(
+        """
+        SELECT conname, contype, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'x', 'c', 'f')
+        """,
+        (table,)
+    )
+    return sorted(cursor.fetchall(), key=lambda constraint: _CONSTRAINT_ORDER[constraint[1]])
+
+
+def _plain_indexes(cursor, table):
+    # Indexes that do not back one of the table's own constraints
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = %s::regclass
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint con
+              WHERE con.conindid = i.indexrelid AND con.conrelid = i.indrelid
+          )
+        """,
+        (table,)
+    )
+    return cursor.fetchall()
+
+
+def _incoming_foreign_keys(cursor, table):
+    cursor.execute(
+        """
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE contype = 'f' AND confrelid = %s::regclass AND conrelid <> confrelid
+        """,
+        (table,)
+    )
+    return cursor.fetchall()
+
+
+def _owned_sequences(cursor, table):
+    # SERIAL columns; their sequences would be dropped with the live table
+    cursor.execute(
+        """
+        SELECT s.oid::regclass::text, a.attname
+        FROM pg_depend d
+        JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+        JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+        WHERE d.refobjid = %s::regclass AND d.deptype = 'a'
+        """,
+        (table,)
+    )
+    return cursor.fetchall()
+
+
+def _grants(cursor, table):
+    cursor.execute(
+        """
+        SELECT CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END,
+               a.privilege_type
+        FROM pg_class c, aclexplode(c.relacl) a
+        WHERE c.oid = %s::regclass AND a.grantee <> c.relowner
+        """,
+        (table,)
+    )
+    return cursor.fetchall()
+
+
+def swap_in(cursor, table, shadow, reloaded_tables=()):
+    """
+    Turn a loaded shadow table into the live table.
+
+    The shadow is made LOGGED, gets the live table's constraints, indexes and
+    grants, is analyzed, and then replaces the live table by DROP and RENAME.
+    Run it in the transaction that created and loaded the shadow: readers keep
+    seeing the old rows until the commit, and the exclusive lock on the live
+    table is only held from the swap to the commit.
+
+    Foreign keys of other tables pointing at this one are dropped with the old
+    table and added back NOT VALID; they are returned so they can be validated
+    after the commit. Triggers and identity columns are not carried over.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        table (str): Name of the live table
+        shadow (str): Shadow table from create_shadow, already loaded
+        reloaded_tables (iterable): Tables reloaded in the same run; foreign
+            keys from them are left for their own reload to rebuild and check
+
+    Returns:
+        list: (table, constraint) foreign keys to validate after the commit
+    """
+    constraints = _constraints(cursor, table)
+    indexes = _plain_indexes(cursor, table)
+    incoming = _incoming_foreign_keys(cursor, table)
+    sequences = _owned_sequences(cursor, table)
+    grants = _grants(cursor, table)
+
+    # Written once to WAL here, before any index exists to be rewritten with it
+    cursor.execute(sql.SQL("ALTER TABLE {} SET LOGGED").format(sql.Identifier(shadow)))
+
+    renames = []
+    for name, contype, definition in constraints:
+        # Keys from the live table are rebuilt and checked in full on the shadow
+        definition = re.sub(r'\s+NOT VALID$', '', definition)
+        new_name = _temp_name(name) if contype in ('p', 'u', 'x') else name
+        cursor.execute(
+            sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {}").format(
+                sql.Identifier(shadow), sql.Identifier(new_name), sql.SQL(definition)
+            )
+        )
+        if new_name != name:
+            renames.append(sql.SQL("ALTER TABLE {} RENAME CONSTRAINT {} TO {}").format(
+                sql.Identifier(table), sql.Identifier(new_name), sql.Identifier(name)
+            ))
+    for name, definition in indexes:
+        match = re.match(r'(CREATE (?:UNIQUE )?INDEX )\S+( ON (?:ONLY )?)\S+', definition)
+        cursor.execute(sql.Composed([
+            sql.SQL(match.group(1)), sql.Identifier(_temp_name(name)),
+            sql.SQL(match.group(2)), sql.Identifier(shadow),
+            sql.SQL(definition[match.end():])
+        ]))
+        renames.append(sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+            sql.Identifier(_temp_name(name)), sql.Identifier(name)
+        ))
+    for grantee, privilege in grants:
+        cursor.execute(
+            sql.SQL("GRANT {} ON {} TO {}").format(sql.SQL(privilege), sql.Identifier(shadow), sql.SQL(grantee))
+        )
+    cursor.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(shadow)))
+
+    # The swap itself: everything from here on holds the live table's lock
+    cursor.execute(sql.SQL("LOCK TABLE {} IN ACCESS EXCLUSIVE MODE").format(sql.Identifier(table)))
+    for child, name, _ in incoming:
+        cursor.execute(sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(sql.SQL(child), sql.Identifier(name)))
+    for sequence, column in sequences:
+        cursor.execute(sql.SQL("ALTER SEQUENCE {} OWNED BY {}.{}").format(
+            sql.SQL(sequence), sql.Identifier(shadow), sql.Identifier(column)
+        ))
+    # No CASCADE: a view on the table makes the swap fail instead of vanishing
+    cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(table)))
+    cursor.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(sql.Identifier(shadow), sql.Identifier(table)))
+    for statement in renames:
+        cursor.execute(statement)
+
+    to_validate = []
+    reloaded_tables = set(reloaded_tables)
+    for child, name, definition in incoming:
+        definition = re.sub(r'\s+NOT VALID$', '', definition)
+        cursor.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {} NOT VALID").format(
+            sql.SQL(child), sql.Identifier(name), sql.SQL(definition)
+        ))
+        if child.strip('"') not in reloaded_tables:
+            to_validate.append((child, name))
+    return to_validate
+
+
+def validate_foreign_keys(cursor, foreign_keys):
+    """
+    Validate foreign keys that swap_in added back NOT VALID.
+
+    Runs without blocking reads or writes on either table.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        foreign_keys (list): (table, constraint) tuples from swap_in
+    """
+    for child, name in foreign_keys:
+        cursor.execute(sql.SQL("ALTER TABLE {} VALIDATE CONSTRAINT {}").format(
+            sql.SQL(child), sql.Identifier(name)
+        ))
@@ -1,4 +1,6 @@
+import os
 from load import DatabaseLoader
+from stage_metrics import StageMetrics
 
 # Database configuration
 DB_CONFIG = {
@@ -9,7 +11,7 @@ DB_CONFIG = {
     'password': 'password'
 }
 
-# Tables in correct load order with expected column counts
+# Tables with expected column counts; they load in parallel, shadow swaps follow their foreign keys
 TABLES = [
     ('dim_aircraft', 10),
     ('dim_airports', 12),
@@ -20,7 +22,17 @@ TABLES = [
     ('dim_date', 11),
     ('fact_reservations', 22),
 ]
+MAX_WORKERS = 4
+# Swap reloaded tables in so dashboards never see them empty
+SHADOW_SWAP = True
 EXTRACTION_DIR = 'data/OLAP'
+# Per-stage timings as JSON lines, and for the node_exporter textfile collector (None to skip)
+METRICS = StageMetrics('dwh_load', 'logs/dwh_load_metrics.jsonl', None)
+# Set PIPELINE_PROFILE_DIR to write per-table CPU / memory profiles of the run there
+PROFILE_DIR = os.environ.get('PIPELINE_PROFILE_DIR')
 if __name__ == '__main__':
-    loader = DatabaseLoader(DB_CONFIG, TABLES, EXTRACTION_DIR)
+    loader = DatabaseLoader(
+        DB_CONFIG, TABLES, EXTRACTION_DIR, MAX_WORKERS, shadow_swap=SHADOW_SWAP,
+        metrics=METRICS, profile_dir=PROFILE_DIR
+    )
     loader.load_data()
\ No newline at end of file
@@ -1,4 +1,6 @@
+import os
 from load import DatabaseLoader
+from stage_metrics import StageMetrics
 
 # Database configuration
 DB_CONFIG = {
@@ -9,7 +11,7 @@ DB_CONFIG = {
     'password': 'password'
 }
 
-# Tables in correct load order with expected column counts
+# Tables with expected column counts; they load in parallel, shadow swaps follow their foreign keys
 TABLES = [
     ('aircraft', 12),
     ('airports', 12),
@@ -20,7 +22,14 @@ TABLES = [
     ('flights', 12),
     ('reservations', 22),
 ]
+MAX_WORKERS = 4
 EXTRACTION_DIR = 'data/OLTP'
+# Per-stage timings as JSON lines, and for the node_exporter textfile collector (None to skip)
+METRICS = StageMetrics('source_load', 'logs/source_load_metrics.jsonl', None)
+# Set PIPELINE_PROFILE_DIR to write per-table CPU / memory profiles of the run there
+PROFILE_DIR = os.environ.get('PIPELINE_PROFILE_DIR')
 if __name__ == '__main__':
-    loader = DatabaseLoader(DB_CONFIG, TABLES, EXTRACTION_DIR)
+    loader = DatabaseLoader(
+        DB_CONFIG, TABLES, EXTRACTION_DIR, MAX_WORKERS, metrics=METRICS, profile_dir=PROFILE_DIR
+    )
     loader.load_data()
\ No newline at end of file
@@ -0,0 +1,24 @@
+from load import DatabaseLoader
+
+# Database configuration
+DB_CONFIG = {
+    'host': 'localhost',
+    'port': 5432,
+    'dbname': 'source',
+    'user': 'user',
+    'password': 'password'
+}
+
+# Tables with daily delta files and their expected column counts
+TABLES = [
+    ('passengers', 17),
+    ('reservations', 22),
+]
+MAX_WORKERS = 4
+DELTA_DIR = 'data/OLTP/delta'
+# Rows only overwrite existing ones with an older value in this column
+NEWER_COLUMN = 'updated_at'
+if __name__ == '__main__':
+    loader = DatabaseLoader(DB_CONFIG, TABLES, DELTA_DIR, MAX_WORKERS,
+                            merge=True, merge_newer_column=NEWER_COLUMN)
+    loader.load_data()
\ No newline at end of file
@@ -0,0 +1,85 @@
+import math
+import numpy as np
+
+
+def zipf_indices(rng, n, size, exponent=0.0):
+    """
+    Draw indices in [0, n) with a bounded Zipf (power-law) distribution.
+
+    Rank k is drawn with probability proportional to k ** -exponent, through
+    the inverse CDF of the continuous power law, so no table of n weights is
+    needed. Ranks are then scattered over [0, n) by a fixed bijection, so the
+    hot keys are not simply the first ids. An exponent of 0 is uniform and
+    draws exactly what rng.integers(0, n, size) would.
+
+    Args:
+        rng (np.random.Generator): Random stream
+        n (int): Number of distinct keys
+        size (int): Number of draws
+        exponent (float): Skew; around 1 a few keys take a large share
+
+    Returns:
+        np.ndarray: int64 indices
+    """
+    if not exponent or n == 1:
+        return rng.integers(0, n, size)
+    u = rng.random(size)
+    if exponent == 1:
+        ranks = np.power(float(n + 1), u)
+    else:
+        a = 1.0 - exponent
+        ranks = np.power((float(n + 1) ** a - 1.0) * u + 1.0, 1.0 / a)
+    ranks = np.minimum(ranks.astype(np.int64), n) - 1
+    return (ranks * _scatter_multiplier(n)) % n
+
+
+def _scatter_multiplier(n):
+    # Any multiplier coprime with n maps ranks onto [0, n) one to one
+    multiplier = 2654435761 % n or 1
+    while math.gcd(multiplier, n) != 1:
+        multiplier += 1
+    return multiplier
+
+
+def seasonal_days(rng, start, end, size, peaks=(), peak_share=0.0):
+    """
+    Draw dates between start and end, with a share of them around peak seasons.
+
+    Args:
+        rng (np.random.Generator): Random stream
+        start (str): First possible date
+        end (str): Last possible date
+        size (int): Number of draws
+        peaks (list): (month-day, spread in days) tuples, e.g. [('07-15', 20)];
+            every year in the range gets each peak
+        peak_share (float): Fraction of the dates drawn around a peak, the
+            rest being uniform
+
+    Returns:
+        np.ndarray: datetime64[D] dates
+    """
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    days = start + rng.integers(0, (end - start).astype(int) + 1, size)
+    if not peaks or not peak_share:
+        return days
+
+    centres, spreads = [], []
+    first_year = start.astype('datetime64[Y]').astype(int) + 1970
+    last_year = end.astype('datetime64[Y]').astype(int) + 1970
+    for year in range(first_year, last_year + 1):
+        for month_day, spread in peaks:
+            centre = np.datetime64(f"{year}-{month_day}", 'D')
+            if start <= centre <= end:
+                centres.append(centre)
+                spreads.append(spread)
+    if not centres:
+        return days
+    centres, spreads = np.array(centres), np.array(spreads, dtype=float)
+
+    in_peak = rng.random(size) < peak_share
+    peak = rng.integers(0, len(centres), size)
+    offsets = np.rint(rng.normal(0.0, 1.0, size) * spreads[peak]).astype(np.int64)
+    peak_days = centres[peak] + offsets
+    # Peak dates falling outside the range keep their uniform date
+    in_peak &= (peak_days >= start) & (peak_days <= end)
+    return np.where(in_peak, peak_days, days)
@@ -0,0 +1,230 @@
+import io
+import os
+import glob
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
+
+from distributions import seasonal_days, zipf_indices
+
+# 🔥 CONFIGURATION
+NUM_RESERVATIONS = 50000
+CHUNK_SIZE = 100000            # Rows per part file; fixes the output, unlike WORKERS
+WORKERS = os.cpu_count()
+SEED = 0
+FILE_FORMAT = 'csv'            # 'csv' or 'parquet' part files
+# Reservations fall in the two years before this date
+REFERENCE_DATE = '2025-05-10'
+OUTPUT_DIR = "data/OLAP/fact_reservations"
+
+# Dimension sizes, as generated by dummy_dwh.py
+NUM_PASSENGERS = 10000
+NUM_AIRPORTS = 200
+NUM_CHANNELS = 50
+NUM_PROMOTIONS = 500
+NUM_AIRCRAFT = 100
+NUM_FARE_BASIS = 100
+
+# Skew: Zipf exponent per dimension key (0 = uniform, ~1 = a few hot keys)
+SKEW = {'passenger_key': 0.0, 'channel_key': 0.0, 'airport': 0.0}
+# Booking seasons: (month-day, spread in days) peaks and the share of reservations in them
+PEAK_SEASONS = [('07-15', 20), ('12-20', 10)]
+PEAK_SHARE = 0.0
+
+
+def _uuid4(rng, size):
+    """Random version 4 UUID strings"""
+    raw = np.frombuffer(rng.bytes(16 * size), dtype=np.uint8).reshape(size, 16).copy()
+    raw[:, 6] = raw[:, 6] & 0x0F | 0x40
+    raw[:, 8] = raw[:, 8] & 0x3F | 0x80
+    parts = np.frombuffer(raw.tobytes().hex().encode(), dtype=[
+        ('a', 'S8'), ('b', 'S4'), ('c', 'S4'), ('d', 'S4'), ('e', 'S12')
+    ])
+    return pc.binary_join_element_wise(*(pa.array(parts[name]).cast(pa.string()) for name in 'abcde'), '-')
+
+
+def generate_chunk(chunk, count, seed=SEED, reference_date=REFERENCE_DATE,
+                   skew=SKEW, peak_seasons=PEAK_SEASONS, peak_share=PEAK_SHARE):
+    """
+    Generate one chunk of fact_reservations.
+
+    The chunk's random stream is derived from (seed, chunk) alone, so the rows
+    do not depend on which process generates the chunk or in what order.
+
+    Args:
+        chunk (int): Chunk number
+        count (int): Rows to generate
+        seed (int): Base seed of the run
+        reference_date (str): Latest possible reservation date
+        skew (dict): Zipf exponent per key, see SKEW
+        peak_seasons (list): (month-day, spread in days) booking peaks
+        peak_share (float): Share of reservations made around a peak
+
+    Returns:
+        pa.Table: Rows in the column order of fact_reservations
+    """
+    rng = np.random.default_rng([seed, chunk])
+    n = count
+    end = np.datetime64(reference_date, 'D')
+    if peak_share:
+        reservation_date = seasonal_days(rng, end - 2 * 365, end, n, peak_seasons, peak_share)
+    else:
+        reservation_date = end - rng.integers(0, 2 * 365 + 1, n)
+    departure_date = reservation_date + rng.integers(1, 61, n)
+    fare = rng.uniform(100, 2000, n)
+    promo = rng.uniform(0, 300, n)
+    tax = fare * 0.15
+
+    def date_key(days):
+        text = pa.array(days).cast(pa.string())
+        return pc.cast(pc.replace_substring(text, '-', ''), pa.int32())
+
+    classes = np.array(["Economy", "Business", "First"], dtype=object)
+    seats = np.array(list('ABCDE'), dtype=object)
+    years = reservation_date.astype('datetime64[Y]')
+    return pa.table({
+        "ticket_id": _uuid4(rng, n),
+        "channel_key": zipf_indices(rng, NUM_CHANNELS, n, skew.get('channel_key', 0.0)) + 1,
+        "promotion_key": rng.integers(1, NUM_PROMOTIONS + 1, n),
+        "passenger_key": zipf_indices(rng, NUM_PASSENGERS, n, skew.get('passenger_key', 0.0)) + 1,
+        "fare_basis_key": rng.integers(1, NUM_FARE_BASIS + 1, n),
+        "aircraft_key": rng.integers(1, NUM_AIRCRAFT + 1, n),
+        "source_airport": zipf_indices(rng, NUM_AIRPORTS, n, skew.get('airport', 0.0)) + 1,
+        "destination_airport": zipf_indices(rng, NUM_AIRPORTS, n, skew.get('airport', 0.0)) + 1,
+        "reservation_date_key": date_key(reservation_date),
+        "departure_date_key": date_key(departure_date),
+        "booking_class": pa.array(classes[rng.integers(0, 3, n)], pa.string()),
+        "seat_number": pc.binary_join_element_wise(
+            pa.array(rng.integers(1, 61, n)).cast(pa.string()),
+            pa.array(seats[rng.integers(0, 5, n)], pa.string()),
+            ''
+        ),
+        "promotion_amount": promo.round(2),
+        "tax_amount": tax.round(2),
+        "operational_fees": rng.uniform(10, 50, n).round(2),
+        "cancelation_fees": np.zeros(n),
+        "fare_price": fare.round(2),
+        "final_price": (fare + tax - promo).round(2),
+        "is_cancelled": rng.integers(0, 5, n) == 0,  # Mostly not canceled
+        "cancellation_reason": pa.nulls(n, pa.string()),
+        "reservation_year": years.astype(int) + 1970,
+        "reservation_month": (reservation_date.astype('datetime64[M]') - years).astype(int) + 1,
+    })
+
+
+def write_part(chunk, count, output_dir, seed=SEED, reference_date=REFERENCE_DATE, file_format=FILE_FORMAT,
+               **generation):
+    """Generate a chunk and write it as part-<chunk>.csv or .parquet; returns the file path"""
+    path = os.path.join(output_dir, f"part-{chunk:05d}.{file_format}")
+    # Hive skips files starting with '.', so a part being written is never read
+    temp_path = os.path.join(output_dir, f".part-{chunk:05d}.{file_format}.tmp")
+    table = generate_chunk(chunk, count, seed, reference_date, **generation)
+    if file_format == 'parquet':
+        pq.write_table(table, temp_path)
+    else:
+        # Hive's text SerDe does not strip quotes, and no value needs them
+        pa_csv.write_csv(table, temp_path, pa_csv.WriteOptions(quoting_style='none', quoting_header='none'))
+    os.replace(temp_path, path)
+    return path
+
+
+def copy_part(chunk, count, db_config, seed=SEED, reference_date=REFERENCE_DATE, **generation):
+    """Generate a chunk and COPY it into fact_reservations over its own connection"""
+    # Imported here so psycopg2 is only needed when loading straight into Postgres
+    import psycopg2
+
+    data = io.BytesIO()
+    pa_csv.write_csv(generate_chunk(chunk, count, seed, reference_date, **generation), data)
+    data.seek(0)
+    conn = psycopg2.connect(**db_config)
+    try:
+        with conn.cursor() as cursor:
+            cursor.copy_expert("COPY fact_reservations FROM STDIN WITH CSV HEADER NULL ''", data)
+        conn.commit()
+    finally:
+        conn.close()
+    return count
+
+
+def _run_chunks(function, args, kwargs, num_rows, chunk_size, workers):
+    """Call function(chunk, count, *args, **kwargs) for every chunk, in workers processes"""
+    chunks = [(chunk, min(chunk_size, num_rows - start))
+              for chunk, start in enumerate(range(0, num_rows, chunk_size))]
+    if workers <= 1:
+        return [function(*chunk, *args, **kwargs) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(function, *chunk, *args, **kwargs) for chunk in chunks]
+        return [future.result() for future in futures]
+
+
+def write_parts(num_rows=NUM_RESERVATIONS, output_dir=OUTPUT_DIR, chunk_size=CHUNK_SIZE,
+                workers=WORKERS, seed=SEED, reference_date=REFERENCE_DATE, file_format=FILE_FORMAT,
+                **generation):
+    """
+    Generate fact_reservations as numbered part files, in parallel.
+
+    The rows only depend on num_rows, chunk_size and seed: the part files are
+    byte-identical for any number of workers. Every CSV part starts with a
+    header line, which the staging table skips per file (skip.header.line.count).
+
+    Args:
+        num_rows (int): Total number of reservations
+        output_dir (str): Directory for the part files; old parts are removed
+        chunk_size (int): Rows per part file
+        workers (int): Number of processes; 1 generates in this process
+        seed (int): Base seed
+        reference_date (str): Latest possible reservation date
+        file_format (str): 'csv' or 'parquet'
+        **generation: skew, peak_seasons and peak_share, see generate_chunk
+
+    Returns:
+        list: Paths of the part files in order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(output_dir, f"part-*.{file_format}")):
+        os.remove(stale)
+    return _run_chunks(write_part, (output_dir, seed, reference_date, file_format), generation,
+                       num_rows, chunk_size, workers)
+
+
+def load_parts(db_config, num_rows=NUM_RESERVATIONS, chunk_size=CHUNK_SIZE,
+               workers=WORKERS, seed=SEED, reference_date=REFERENCE_DATE, **generation):
+    """
+    Generate fact_reservations straight into Postgres, without files.
+
+    The table is truncated, then every worker COPYs the chunks it generates
+    over its own connection; memory per worker is bounded by chunk_size.
+    The rows are the same as the ones write_parts produces.
+
+    Args:
+        db_config (dict): psycopg2 connection parameters of the DWH database
+        num_rows (int): Total number of reservations
+        chunk_size (int): Rows per COPY
+        workers (int): Number of processes, i.e. concurrent COPY streams
+        seed (int): Base seed
+        reference_date (str): Latest possible reservation date
+        **generation: skew, peak_seasons and peak_share, see generate_chunk
+
+    Returns:
+        int: Number of rows loaded
+    """
+    import psycopg2
+
+    conn = psycopg2.connect(**db_config)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("TRUNCATE TABLE fact_reservations")
+        conn.commit()
+    finally:
+        conn.close()
+    return sum(_run_chunks(copy_part, (db_config, seed, reference_date), generation, num_rows, chunk_size, workers))
+
+
+if __name__ == '__main__':
+    parts = write_parts()
+    print(f"✅ {NUM_RESERVATIONS} reservations written to {len(parts)} part files in '{OUTPUT_DIR}/'")
+    print("   Upload them to the fact_reservations location of dwh_staging.sql, e.g.")
+    print(f"   hdfs dfs -put {OUTPUT_DIR}/part-*.{FILE_FORMAT} /data/airline/fact_reservations/")
@@ -0,0 +1,495 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from faker import Faker
+
+from distributions import seasonal_days, zipf_indices
+
+# 🔥 CONFIGURATION
+OUTPUT_FORMAT = 'csv'          # 'csv' files or 'parquet' part files; see db/scripts for COPY
+SCALE_FACTOR = 1               # 1 ~ the dataset of dumy_source.py, 1000 ~ 20M reservations
+CHUNK_SIZE = 500000            # Rows generated and written per batch
+SEED = 0
+OUTPUT_DIR = 'data/OLTP'
+
+# Rows per unit of scale factor; the lookup tables keep a fixed size
+SCALED_ROWS = {'passengers': 10000, 'flights': 1000, 'reservations': 20000}
+FIXED_ROWS = {'aircraft': 50, 'airports': 50, 'sales_channels': 2, 'promotions': 20, 'fare_basis_codes': 50}
+
+# Tables in load order, parents first
+TABLES = ['aircraft', 'airports', 'sales_channels', 'promotions',
+          'passengers', 'fare_basis_codes', 'flights', 'reservations']
+
+# Distinct Faker values drawn per pool; rows pick from the pools by index
+POOL_SIZE = 1000
+
+# Skew: Zipf exponent per referenced table (0 = uniform, ~1 = a few hot keys).
+# 'airports' skews flight departures and arrivals towards hubs
+SKEW = {'passengers': 0.0, 'flights': 0.0, 'sales_channels': 0.0, 'airports': 0.0}
+# Booking seasons: (month-day, spread in days) peaks and the share of bookings in them
+PEAK_SEASONS = [('07-15', 20), ('12-20', 10)]
+PEAK_SHARE = 0.0
+
+
+def _days(rng, start, end, size):
+    """Random dates between start and end (inclusive) as datetime64[D]"""
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    return start + rng.integers(0, (end - start).astype(int) + 1, size)
+
+
+def _date_column(days):
+    # pandas has no day resolution; an Arrow date32 column keeps DATE values dates
+    return pd.arrays.ArrowExtensionArray(pa.array(days))
+
+
+def _dates(rng, start, end, size):
+    """Random dates between start and end (inclusive) as a date column"""
+    return _date_column(_days(rng, start, end, size))
+
+
+def _datetimes(rng, start, end, size):
+    """Random datetimes between start and end (inclusive) as datetime64[s]"""
+    start, end = np.datetime64(start, 's'), np.datetime64(end, 's')
+    return start + rng.integers(0, (end - start).astype(np.int64) + 1, size)
+
+
+def _ids(prefix, numbers, width):
+    """Format 1-based numbers as zero padded ids, e.g. PA000001"""
+    padded = pc.utf8_lpad(pa.array(numbers).cast(pa.string()), width=width, padding='0')
+    return pd.arrays.ArrowExtensionArray(pc.binary_join_element_wise(prefix, padded, ''))
+
+
+def _pick(rng, values, size):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), size)]
+
+
+def _letters(numbers, length):
+    """Spell integers below 26 ** length as upper-case letter codes"""
+    alphabet = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'), dtype=object)
+    codes = np.full(len(numbers), '', dtype=object)
+    for _ in range(length):
+        codes = alphabet[numbers % 26] + codes
+        numbers = numbers // 26
+    return codes
+
+
+class CsvChunkStream(io.RawIOBase):
+    def __init__(self, tables, include_header=False):
+        """
+        Readable binary stream rendering Arrow tables as CSV one at a time.
+
+        Meant for cursor.copy_expert: only the chunk being read is held in
+        memory, whatever the size of the whole table.
+
+        Args:
+            tables (iterable): pa.Table chunks with the same schema
+            include_header (bool): Start with a header line
+        """
+        self._tables = iter(tables)
+        self._include_header = include_header
+        self._buffer = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            table = next(self._tables, None)
+            if table is None:
+                return 0
+            out = io.BytesIO()
+            pa_csv.write_csv(table, out, pa_csv.WriteOptions(include_header=self._include_header))
+            self._include_header = False
+            self._buffer = out.getbuffer()
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class SourceDataGenerator:
+    def __init__(self, scale_factor=SCALE_FACTOR, chunk_size=CHUNK_SIZE, seed=SEED,
+                 skew=None, peak_seasons=PEAK_SEASONS, peak_share=PEAK_SHARE):
+        """
+        Generate the OLTP source tables column-wise in NumPy batches.
+
+        Every chunk of every table has its own random stream derived from
+        (seed, table, chunk index), so a table can be generated chunk by chunk,
+        in any order, with the same result. Foreign keys are drawn as row
+        numbers of the parent table and formatted the way the parent formats
+        its ids, so children never need the parent rows in memory.
+
+        Args:
+            scale_factor (float): Multiplier for passengers, flights and reservations
+            chunk_size (int): Rows per generated DataFrame
+            seed (int): Seed for all random streams and the Faker value pools
+            skew (dict): Zipf exponent per referenced table, see SKEW; missing
+                tables are uniform
+            peak_seasons (list): (month-day, spread in days) booking peaks
+            peak_share (float): Share of reservations booked around a peak
+        """
+        self.scale_factor = scale_factor
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self._pools = None
+        self._lookups = {}
+        self.skew = SKEW if skew is None else skew
+        self.peak_seasons = peak_seasons
+        self.peak_share = peak_share
+
+    def row_count(self, table):
+        if table in SCALED_ROWS:
+            return max(1, int(SCALED_ROWS[table] * self.scale_factor))
+        return FIXED_ROWS[table]
+
+    def _rng(self, table, chunk=0):
+        return np.random.default_rng([self.seed, TABLES.index(table), chunk])
+
+    def _keys(self, rng, table, count, size):
+        """Row numbers (0-based) of a referenced table, skewed per self.skew"""
+        return zipf_indices(rng, count, size, self.skew.get(table, 0.0))
+
+    @property
+    def pools(self):
+        """Faker values drawn once and shared by all chunks"""
+        if self._pools is None:
+            fake = Faker()
+            fake.seed_instance(self.seed)
+            self._pools = {
+                'first_name': [fake.first_name() for _ in range(POOL_SIZE)],
+                'last_name': [fake.last_name() for _ in range(POOL_SIZE)],
+                'email': [fake.email() for _ in range(POOL_SIZE)],
+                'country': [fake.country()[:50] for _ in range(POOL_SIZE)],
+                'city': [fake.city() for _ in range(POOL_SIZE)],
+                'state': [fake.state() for _ in range(POOL_SIZE)],
+                'timezone': [fake.timezone() for _ in range(POOL_SIZE)],
+            }
+        return self._pools
+
+    def lookup(self, table):
+        """The whole of a fixed size table, generated once"""
+        if table not in self._lookups:
+            self._lookups[table] = getattr(self, f'_generate_{table}')(self._rng(table))
+        return self._lookups[table]
+
+    # ---------------------- lookup tables ----------------------
+    def _generate_aircraft(self, rng):
+        n = FIXED_ROWS['aircraft']
+        model = _pick(rng, ['B737', 'A320', 'B787', 'A350', 'B777', 'A380'], n)
+        total_capacity = rng.integers(100, 501, n)
+        economy = (total_capacity * 0.8).astype(int)
+        business = (total_capacity * 0.15).astype(int)
+        return pd.DataFrame({
+            "aircraft_id": _ids('AC', np.arange(1, n + 1), 4),
+            "model": model,
+            "manufacturer": np.where(pd.Series(model).str.startswith('B'), 'Boeing', 'Airbus'),
+            "total_capacity": total_capacity,
+            "economy_seats": economy,
+            "business_seats": business,
+            "first_class_seats": total_capacity - economy - business,
+            "manufacture_year": rng.integers(1990, 2024, n),
+            "fuel_efficiency": rng.uniform(2.5, 5.5, n).round(2),
+            "maintenance_status": _pick(rng, ['Good', 'Maintenance Required', 'Excellent'], n),
+            "created_at": _dates(rng, '2010-01-01', '2023-01-01', n),
+            "updated_at": _dates(rng, '2020-01-01', '2023-01-01', n),
+        })
+
+    def _generate_airports(self, rng):
+        n = FIXED_ROWS['airports']
+        pools = self.pools
+        city = _pick(rng, pools['city'], n)
+        return pd.DataFrame({
+            "airport_code": _letters(rng.choice(26 ** 3, n, replace=False), 3),
+            "airport_name": city + " International Airport",
+            "city": _pick(rng, pools['city'], n),
+            "country": _pick(rng, pools['country'], n),
+            "region": _pick(rng, pools['state'], n),
+            "timezone": _pick(rng, pools['timezone'], n),
+            "latitude": rng.uniform(-90, 90, n).round(6),
+            "longitude": rng.uniform(-180, 180, n).round(6),
+            "runway_count": rng.integers(1, 5, n),
+            "size_category": _pick(rng, ['Small', 'Medium', 'Large'], n),
+            "created_at": _dates(rng, '2010-01-01', '2023-01-01', n),
+            "updated_at": _dates(rng, '2020-01-01', '2023-01-01', n),
+        })
+
+    def _generate_sales_channels(self, rng):
+        return pd.DataFrame({
+            "channel_id": [1, 2],
+            "channel_name": ["Online Website", "Airport Counter"],
+            "channel_type": ["Website", "Counter"],
+            "category": ["ONLINE", "OFFLINE"],
+            "commission_rate": [round(rng.uniform(5.0, 15.0), 2), round(rng.uniform(3.0, 10.0), 2)],
+            "is_active": [True, True],
+            "created_at": _dates(rng, '2010-01-01', '2023-01-01', 2),
+            "updated_at": _dates(rng, '2020-01-01', '2023-01-01', 2),
+        })
+
+    def _generate_promotions(self, rng):
+        n = FIXED_ROWS['promotions']
+        discount_type = _pick(rng, ['PERCENTAGE', 'FIXED'], n)
+        percentage = discount_type == 'PERCENTAGE'
+        start_days = _days(rng, '2020-01-01', '2023-01-01', n)
+        start_date = _date_column(start_days)
+        end_date = _date_column(
+            start_days + rng.integers(0, (np.datetime64('2023-12-31') - start_days).astype(int) + 1)
+        )
+        return pd.DataFrame({
+            "promotion_id": _ids('PR', np.arange(1, n + 1), 4),
+            "promotion_name": _pick(rng, ['Summer', 'Winter', 'Spring', 'Fall'], n) + " Sale",
+            "promotion_type": _pick(rng, ['Seasonal', 'Flash', 'Loyalty'], n),
+            "target_segment": _pick(rng, ['All', 'Business', 'Leisure'], n),
+            "channel": _pick(rng, ['ONLINE', 'OFFLINE', 'BOTH'], n),
+            "start_date": start_date,
+            "end_date": end_date,
+            "discount_value": np.where(percentage, rng.uniform(5, 30, n), rng.uniform(20, 200, n)).round(2),
+            "discount_type": discount_type,
+            "max_discount_amount": np.where(percentage, rng.uniform(50, 300, n).round(2), np.nan),
+            "effective_date": start_date,
+            "expiry_date": end_date,
+            "is_current": True,
+            "created_at": _dates(rng, '2020-01-01', '2023-01-01', n),
+            "updated_at": _dates(rng, '2020-01-01', '2023-01-01', n),
+        })
+
+    def _generate_fare_basis_codes(self, rng):
+        n = FIXED_ROWS['fare_basis_codes']
+        # Codes are <class><'', E or F><100-999>; drawn without replacement so they stay unique
+        combos = rng.choice(3 * 3 * 900, n, replace=False)
+        fare_class = np.array(['Y', 'B', 'F'], dtype=object)[combos // 2700]
+        suffix = np.array(['', 'E', 'F'], dtype=object)[combos // 900 % 3]
+        is_refundable = rng.random(n) > 0.3
+        return pd.DataFrame({
+            "fare_basis_id": _ids('FB', np.arange(1, n + 1), 4),
+            "fare_basis_code": fare_class + suffix + (combos % 900 + 100).astype(str).astype(object),
+            "fare_class": fare_class,
+            "is_refundable": is_refundable,
+            "is_changeable": rng.random(n) > 0.4,
+            "description": fare_class + " class " + np.where(is_refundable, 'refundable', 'non-refundable') + " fare",
+            "baggage_allowance": rng.integers(1, 4, n).astype(str).astype(object) + " checked bags",
+            "meal_included": np.isin(fare_class, ['B', 'F']) | (rng.random(n) > 0.5),
+            "upgrade_eligible": fare_class != 'F',
+            "created_at": _dates(rng, '2010-01-01', '2023-01-01', n),
+            "updated_at": _dates(rng, '2020-01-01', '2023-01-01', n),
+        })
+
+    # ---------------------- scaled tables ----------------------
+    def _chunks(self, table):
+        """Yield (chunk index, first row number, row count) for a scaled table"""
+        total = self.row_count(table)
+        for chunk, start in enumerate(range(0, total, self.chunk_size)):
+            yield chunk, start, min(self.chunk_size, total - start)
+
+    def _passengers_chunk(self, rng, start, n):
+        pools = self.pools
+        numbers = np.arange(start + 1, start + n + 1)
+        # An odd multiplier is a bijection modulo 10**9, so the numbers stay unique
+        ssn = pd.Series((numbers * 387420489 + 123456789) % 10 ** 9).astype(str).str.zfill(9)
+        has_ff = rng.random(n) > 0.3
+        return pd.DataFrame({
+            "passenger_id": _ids('PA', numbers, 6),
+            "national_id": ssn.str[:3] + '-' + ssn.str[3:5] + '-' + ssn.str[5:],
+            "first_name": _pick(rng, pools['first_name'], n),
+            "last_name": _pick(rng, pools['last_name'], n),
+            "date_of_birth": _dates(rng, '1943-01-01', '2005-01-01', n),
+            "nationality": _pick(rng, pools['country'], n),
+            "email": _pick(rng, pools['email'], n),
+            "phone_number": ('+' + pd.Series(rng.integers(1, 100, n)).astype(str)
+                             + ' ' + pd.Series(rng.integers(100, 1000, n)).astype(str)
+                             + ' ' + pd.Series(rng.integers(1000, 10000, n)).astype(str)),
+            "gender": _pick(rng, ['M', 'F'], n),
+            "status": 'ACTIVE',
+            "frequent_flyer_number": ('FF' + pd.Series(rng.integers(100000, 1000000, n)).astype(str)).where(has_ff),
+            "frequent_flyer_tier": pd.Series(_pick(rng, ['Silver', 'Gold', 'Platinum'], n)).where(has_ff),
+            "effective_date": _dates(rng, '2010-01-01', '2023-01-01', n),
+            "expiry_date": _dates(rng, '2020-01-01', '2023-01-01', n),
+            "is_current": True,
+            "created_at": _dates(rng, '2010-01-01', '2023-01-01', n),
+            "updated_at": _dates(rng, '2020-01-01', '2023-01-01', n),
+        })
+
+    def _flights_chunk(self, rng, start, n):
+        aircraft = self.lookup('aircraft')['aircraft_id'].to_numpy()
+        airports = self.lookup('airports')['airport_code'].to_numpy()
+        departure = self._keys(rng, 'airports', len(airports), n)
+        # An offset of 1..len-1 never lands on the departure airport
+        if self.skew.get('airports'):
+            arrival = self._keys(rng, 'airports', len(airports), n)
+            same = arrival == departure
+            arrival[same] = (departure[same] + rng.integers(1, len(airports), same.sum())) % len(airports)
+        else:
+            arrival = (departure + rng.integers(1, len(airports), n)) % len(airports)
+        scheduled_departure = (_days(rng, '2023-01-01', '2023-12-31', n).astype('datetime64[s]')
+                               + rng.integers(0, 24 * 60, n) * np.timedelta64(60, 's'))
+        scheduled_arrival = scheduled_departure + rng.integers(1, 13, n) * np.timedelta64(3600, 's')
+        flown = rng.random(n) > 0.1
+        return pd.DataFrame({
+            "flight_id": _ids('FL', np.arange(start + 1, start + n + 1), 5),
+            "flight_number": (_pick(rng, ['AA', 'DL', 'UA', 'BA', 'LH'], n)
+                              + pd.Series(rng.integers(100, 10000, n)).astype(str)),
+            "aircraft_id": aircraft[rng.integers(0, len(aircraft), n)],
+            "departure_airport": airports[departure],
+            "arrival_airport": airports[arrival],
+            "scheduled_departure": scheduled_departure,
+            "scheduled_arrival": scheduled_arrival,
+            "actual_departure": np.where(flown, scheduled_departure, np.datetime64('NaT')),
+            "actual_arrival": np.where(flown, scheduled_arrival, np.datetime64('NaT')),
+            "flight_status": np.where(flown, _pick(rng, ['On Time', 'Delayed'], n), 'Cancelled'),
+            "created_at": _dates(rng, '2020-01-01', '2023-01-01', n),
+            "updated_at": _dates(rng, '2022-01-01', '2023-01-01', n),
+        })
+
+    def _fare_prices(self):
+        """One base price per fare class, shared by every reservation chunk"""
+        rng = np.random.default_rng([self.seed, len(TABLES)])
+        return {
+            'Y': round(rng.uniform(100, 500), 2),
+            'B': round(rng.uniform(500, 1500), 2),
+            'F': round(rng.uniform(1500, 3000), 2),
+        }
+
+    def _booking_datetimes(self, rng, n):
+        if not self.peak_share:
+            return _datetimes(rng, '2022-01-01', '2023-01-01', n)
+        days = seasonal_days(rng, '2022-01-01', '2023-01-01', n, self.peak_seasons, self.peak_share)
+        return days.astype('datetime64[s]') + rng.integers(0, 24 * 3600, n).astype('timedelta64[s]')
+
+    def _reservations_chunk(self, rng, start, n):
+        fare_basis = self.lookup('fare_basis_codes')
+        promotions = self.lookup('promotions')['promotion_id'].to_numpy()
+        channels = self.lookup('sales_channels')['channel_id'].to_numpy()
+        prices = self._fare_prices()
+
+        fare_index = rng.integers(0, len(fare_basis), n)
+        booking_class = fare_basis['fare_class'].to_numpy()[fare_index]
+        base_price = pd.Series(booking_class).map(prices).to_numpy()
+        has_promo = rng.random(n) > 0.7
+        promo_amount = np.where(has_promo, rng.uniform(10, 100, n).round(2), 0.0)
+        taxes = (base_price * 0.1).round(2)
+        fees = rng.uniform(10, 50, n).round(2)
+        is_cancelled = rng.random(n) > 0.9
+        return pd.DataFrame({
+            "reservation_id": _ids('RS', np.arange(start + 1, start + n + 1), 6),
+            "ticket_number": 'TK' + pd.Series(rng.integers(100000000, 1000000000, n)).astype(str),
+            "passenger_id": _ids('PA', self._keys(rng, 'passengers', self.row_count('passengers'), n) + 1, 6),
+            "channel_id": channels[self._keys(rng, 'sales_channels', len(channels), n)],
+            "promotion_id": pd.Series(promotions[rng.integers(0, len(promotions), n)]).where(has_promo),
+            "fare_basis_id": fare_basis['fare_basis_id'].to_numpy()[fare_index],
+            "flight_id": _ids('FL', self._keys(rng, 'flights', self.row_count('flights'), n) + 1, 5),
+            "booking_date": self._booking_datetimes(rng, n),
+            "departure_date": _datetimes(rng, '2023-01-01', '2023-12-31', n),
+            "booking_class": booking_class,
+            "seat_number": pd.Series(rng.integers(1, 51, n)).astype(str) + _pick(rng, list('ABCDEF'), n),
+            "promotion_amount": promo_amount,
+            "tax_amount": taxes,
+            "operational_fees": fees,
+            "cancellation_fees": np.where(is_cancelled, (base_price * 0.2).round(2), 0.0),
+            "fare_price": base_price,
+            "final_price": (base_price + taxes + fees - promo_amount).round(2),
+            "is_cancelled": is_cancelled,
+            "cancellation_reason": pd.Series(_pick(
+                rng, ['Personal reasons', 'Schedule change', 'Found better price'], n
+            )).where(is_cancelled),
+            "cancellation_date": np.where(is_cancelled, _datetimes(rng, '2023-01-01', '2023-12-31', n),
+                                          np.datetime64('NaT')),
+            "created_at": _datetimes(rng, '2022-01-01', '2023-01-01', n),
+            "updated_at": _datetimes(rng, '2022-01-01', '2023-01-01', n),
+        })
+
+    def iter_chunks(self, table):
+        """
+        Generate a table as a sequence of DataFrames.
+
+        Args:
+            table (str): One of TABLES
+
+        Yields:
+            pd.DataFrame: Up to chunk_size rows, columns in table order
+        """
+        if table in FIXED_ROWS:
+            yield self.lookup(table)
+            return
+        generate_chunk = getattr(self, f'_{table}_chunk')
+        for chunk, start, count in self._chunks(table):
+            yield generate_chunk(self._rng(table, chunk), start, count)
+
+    def iter_arrow(self, table):
+        """Generate a table as a sequence of pa.Table chunks sharing one schema"""
+        schema = None
+        for chunk in self.iter_chunks(table):
+            # Later chunks reuse the first one's schema, even for columns that are all NULL
+            batch = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False).replace_schema_metadata()
+            schema = batch.schema
+            yield batch
+
+    def open_csv_stream(self, table, include_header=False):
+        """Open a table as a CSV byte stream, generated while it is read"""
+        return io.BufferedReader(CsvChunkStream(self.iter_arrow(table), include_header), 1024 * 1024)
+
+    def write_csv(self, table, path):
+        """
+        Stream a table to a CSV file chunk by chunk.
+
+        Arrow's CSV writer is used instead of DataFrame.to_csv, which spends
+        most of its time formatting floats and timestamps in Python.
+
+        Returns:
+            int: Number of rows written
+        """
+        rows = 0
+        writer = None
+        try:
+            for batch in self.iter_arrow(table):
+                if writer is None:
+                    writer = pa_csv.CSVWriter(path, batch.schema)
+                writer.write_table(batch)
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def write_parquet(self, table, directory):
+        """
+        Write a table as Parquet part files, one per chunk.
+
+        Args:
+            table (str): One of TABLES
+            directory (str): Directory for part-NNNNN.parquet; old parts are removed
+
+        Returns:
+            int: Number of rows written
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.startswith('part-') and name.endswith('.parquet'):
+                os.remove(os.path.join(directory, name))
+        rows = 0
+        for index, batch in enumerate(self.iter_arrow(table)):
+            pq.write_table(batch, os.path.join(directory, f"part-{index:05d}.parquet"))
+            rows += batch.num_rows
+        return rows
+
+
+# ---------------------- Main Execution ----------------------
+def main():
+    """Main execution function"""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    generator = SourceDataGenerator(SCALE_FACTOR, CHUNK_SIZE, SEED)
+    for table in TABLES:
+        print(f"🔥 Generating {table} data...")
+        if OUTPUT_FORMAT == 'parquet':
+            rows = generator.write_parquet(table, f'{OUTPUT_DIR}/{table}')
+        else:
+            rows = generator.write_csv(table, f'{OUTPUT_DIR}/{table}.csv')
+        print(f"   {rows} rows")
+
+    print(f"✅ All {OUTPUT_FORMAT} files generated successfully in '{OUTPUT_DIR}' directory!")
+
+if __name__ == '__main__':
+    main()
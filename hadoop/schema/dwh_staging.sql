@@ -19,10 +19,9 @@ CREATE EXTERNAL TABLE fact_reservations (
     fare_price              DECIMAL(10,2),
     final_price             DECIMAL(10,2),
     is_cancelled            BOOLEAN,
-    cancellation_reason     STRING,
-    reservation_year        INT,
-    reservation_month       INT
+    cancellation_reason     STRING
 )
+PARTITIONED BY (reservation_year INT, reservation_month INT)
 ROW FORMAT DELIMITED
 FIELDS TERMINATED BY ','
 STORED AS TEXTFILE
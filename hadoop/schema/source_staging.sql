@@ -166,6 +166,7 @@ CREATE EXTERNAL TABLE reservations (
     created_at TIMESTAMP,
     updated_at TIMESTAMP
 )
+PARTITIONED BY (reservation_year INT, reservation_month INT)
 ROW FORMAT DELIMITED
 FIELDS TERMINATED BY ','
 STORED AS TEXTFILE
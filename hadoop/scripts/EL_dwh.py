@@ -1,13 +1,29 @@
 import csv
 import os
-import subprocess
+import threading
+import time
 import psycopg2
+from concurrent.futures import ThreadPoolExecutor
 from psycopg2 import sql
 from psycopg2.extras import DictCursor
 from io import StringIO
+from sinks import HdfsCliSink
+from text_codecs import compressed, text_extension
+from row_writers import open_row_writer
+from partitions import PartitionRouter, partition_select, add_partition_statements
+from stage_metrics import StageMetrics
+from profiling import TableProfiler
+from checkpoints import ChunkCheckpoints
+from pg_catalog import (
+    get_columns, build_select_list, order_by_size, plan_ctid_ranges, ctid_range_condition, table_fingerprint
+)
 
 class PostgresToHdfsExporter:
-    def __init__(self, pg_config, hdfs_path, tables, hdfs_container, container_temp_dir):
+    def __init__(self, pg_config, hdfs_path, tables, hdfs_container, container_temp_dir,
+                 streaming=False, buffer_size=1024 * 1024, max_workers=1,
+                 partition_rows=1000000, max_partitions=8, file_format='csv', compression=None,
+                 row_group_size=100000, sink=None, partition_by=None, metrics=None,
+                 profile_dir=None, checkpoint_path=None):
         """
         Initialize the exporter with configuration parameters.
         
@@ -17,12 +33,60 @@ class PostgresToHdfsExporter:
             tables (list): List of tables to export
             hdfs_container (str): Name of the HDFS container (Docker container name)
             container_temp_dir (str): Temporary directory inside the container for staging files
+            streaming (bool): Pipe COPY ... TO STDOUT straight into a sink stream
+                instead of staging CSV files on the host
+            buffer_size (int): Size in bytes of the chunks written to sink streams
+            max_workers (int): Number of tables exported concurrently, each on its own connection
+            partition_rows (int): In streaming mode, tables estimated to hold more rows than this
+                are split into block ranges exported in parallel as part files (None disables)
+            max_partitions (int): Maximum number of block ranges per table
+            file_format (str): 'csv', or 'parquet'/'orc' for typed columnar files
+                (columnar formats and compressed CSV are always streamed)
+            compression (str): For CSV 'gzip', 'bzip2' or 'zstd' (None writes plain
+                text), added to the file name as .gz/.bz2/.zst; for columnar formats
+                the codec inside the file, such as 'snappy' (default) or 'zstd'
+            row_group_size (int): Rows per Parquet row group / ORC write batch
+            sink (Sink): Where the files are written (see sinks); defaults to
+                ``hdfs dfs`` in hdfs_container
+            partition_by (dict): Tables to write as Hive partition directories, mapped
+                to their (partition_column, sql_expression) list, e.g.
+                ``{'fact_reservations': column_partitions('reservation_year', 'reservation_month')}``
+                (see partitions); these tables are always streamed
+            metrics (StageMetrics): Collects per-table stage timings, row and byte
+                counts; give it output paths to get JSON lines or a Prometheus textfile
+            profile_dir (str): Write CPU and memory profiles of each table to a run
+                directory below this one (see profiling.TableProfiler); None disables
+            checkpoint_path (str): JSON file recording the files each table's
+                unfinished export already wrote (see checkpoints.ChunkCheckpoints);
+                defaults to last_extracts/dwh_chunk_checkpoints.json
         """
         self.pg_config = pg_config
         self.hdfs_path = hdfs_path
         self.tables = tables
         self.hdfs_container = hdfs_container
         self.container_temp_dir = container_temp_dir
+        self.streaming = streaming
+        self.buffer_size = buffer_size
+        self.max_workers = max_workers
+        self.partition_rows = partition_rows
+        self.max_partitions = max_partitions
+        self.file_format = file_format
+        self.file_extension = f".{file_format}"
+        if file_format == 'csv':
+            self.file_extension += text_extension(compression)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.sink = sink or HdfsCliSink(hdfs_container, container_temp_dir, buffer_size)
+        self.partition_by = partition_by or {}
+        # Partition directories written by the last export, per table
+        self.touched_partitions = {}
+        self._partitions_lock = threading.Lock()
+        self.metrics = metrics or StageMetrics('export')
+        self.profiler = TableProfiler(profile_dir)
+        last_extract_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'last_extracts')
+        self.checkpoints = ChunkCheckpoints(
+            checkpoint_path or os.path.join(last_extract_dir, 'dwh_chunk_checkpoints.json')
+        )
         
         # Ensure temp dir ends with a slash
         if not self.container_temp_dir.endswith('/'):
@@ -40,40 +104,45 @@ class PostgresToHdfsExporter:
     
     def _export_table_to_csv(self, table_name):
         """
-        Export a PostgreSQL table to a CSV file in the container's temp directory.
+        Export a PostgreSQL table to a CSV file in a temp directory on the host.
         
         Args:
             table_name (str): Name of the table to export
             
         Returns:
-            str: Path to the generated CSV file in the container
+            str: Path to the generated CSV file on the host
         """
-        # Create a CSV file in the container's temp directory
         csv_filename = f"{table_name}.csv"
-        container_csv_path = os.path.join(self.container_temp_dir, csv_filename)
         
         # Connect to PostgreSQL
         conn = self._get_postgres_connection()
         cursor = conn.cursor()
         
         try:
+            start = time.perf_counter()
+            
             # Create a StringIO buffer to hold CSV data
             csv_buffer = StringIO()
             
             # Execute query and get column names
             cursor.execute(sql.SQL("SELECT * FROM {}").format(sql.Identifier(table_name)))
             colnames = [desc[0] for desc in cursor.description]
+            query_seconds = time.perf_counter() - start
             
             # Create CSV writer
             csv_writer = csv.writer(csv_buffer)
             csv_writer.writerow(colnames)
             
             # Fetch data and write to CSV
+            row_count = 0
             while True:
+                fetch_start = time.perf_counter()
                 rows = cursor.fetchmany(size=1000)
+                query_seconds += time.perf_counter() - fetch_start
                 if not rows:
                     break
                 csv_writer.writerows(rows)
+                row_count += len(rows)
             
             # Write CSV data to a temporary file on host
             host_temp_dir = '/tmp/csv_staging'
@@ -83,84 +152,460 @@ class PostgresToHdfsExporter:
             with open(host_csv_path, 'w') as f:
                 f.write(csv_buffer.getvalue())
             
-            # Copy file from host to container
-            subprocess.run([
-                'docker', 'cp', 
-                host_csv_path, 
-                f"{self.hdfs_container}:{container_csv_path}"
-            ], check=True)
-            
-            # Clean up host temp file
-            os.remove(host_csv_path)
-            
-            return container_csv_path
+            self.metrics.record(table_name, 'query', query_seconds, rows=row_count)
+            self.metrics.record(
+                table_name, 'serialize', time.perf_counter() - start - query_seconds,
+                size=os.path.getsize(host_csv_path)
+            )
+            return host_csv_path
             
         finally:
             cursor.close()
             conn.close()
     
-    def _load_csv_to_hdfs(self, table_name, container_csv_path):
+    def _load_csv_to_hdfs(self, table_name, host_csv_path):
         """
-        Load a CSV file from the container to HDFS.
+        Load a CSV file from the host into the table's _tmp directory in HDFS.
         
         Args:
             table_name (str): Name of the table being exported
-            container_csv_path (str): Path to CSV file in the container
+            host_csv_path (str): Path to CSV file on the host
             
         Returns:
             bool: True if successful, False otherwise
         """
-        hdfs_table_path = os.path.join(self.hdfs_path, table_name)
-        
         try:
-            # Create HDFS directory if it doesn't exist
-            subprocess.run([
-                'docker', 'exec', self.hdfs_container,
-                'hdfs', 'dfs', '-mkdir', '-p', hdfs_table_path
-            ], check=True)
-            
-            # Copy file from container local to HDFS
-            subprocess.run([
-                'docker', 'exec', self.hdfs_container,
-                'hdfs', 'dfs', '-put',
-                '-f', container_csv_path,
-                hdfs_table_path
-            ], check=True)
+            with self.metrics.stage(table_name, 'upload') as counts:
+                counts['bytes'] = os.path.getsize(host_csv_path)
+                steps = self.sink.upload([host_csv_path], self._tmp_path(table_name))
+            # e.g. docker_cp and hdfs_put for the container sink
+            for step, seconds in (steps or {}).items():
+                self.metrics.record(table_name, step, seconds)
             
+            self.checkpoints.add_chunk(table_name, os.path.basename(host_csv_path), partitions=[''])
             return True
-        except subprocess.CalledProcessError as e:
+        except RuntimeError as e:
             print(f"Error loading {table_name} to HDFS: {e}")
             return False
         finally:
-            # Clean up the CSV file in the container
-            subprocess.run([
-                'docker', 'exec', self.hdfs_container,
-                'rm', '-f', container_csv_path
-            ], check=False)
+            # Clean up host temp file
+            os.remove(host_csv_path)
+    
+    def _write_rows(self, cursor, table_name, columns, block_range, file_name):
+        """
+        Write a table or one block range of it row by row, one file per partition.
+        
+        Rows are read through a server-side cursor one row group at a time and
+        routed to a ``file_name`` sink stream in their partition directory below
+        the table's _tmp directory. The streams are only committed once every row
+        is written. An unpartitioned table is written to the _tmp directory
+        itself, as one file even when empty.
+        
+        Returns:
+            list: Partition directories written ('' for the table directory)
+        """
+        spec = self.partition_by.get(table_name, [])
+        hdfs_table_path = self._tmp_path(table_name)
+        # Partition columns taken as they are (column_partitions) live in the
+        # directory names; Hive does not expect them in the files as well
+        columns = [(name, data_type) for name, data_type in columns if (name, name) not in spec]
+        # Columnar formats keep booleans typed; text needs them as true/false
+        if self.file_format == 'csv':
+            select_list = build_select_list(columns)
+        else:
+            select_list = sql.SQL(', ').join(sql.Identifier(name) for name, _ in columns)
+        query = sql.SQL("SELECT {}{} FROM {}").format(
+            select_list, sql.SQL(partition_select(spec)), sql.Identifier(table_name)
+        )
+        condition = ctid_range_condition(block_range)
+        if condition is not None:
+            query = sql.SQL("{} WHERE {}").format(query, sql.SQL(condition))
+        
+        streams = {}
+        
+        def open_writer(partition_dir):
+            directory = hdfs_table_path
+            if partition_dir:
+                directory = os.path.join(hdfs_table_path, partition_dir)
+                self.sink.makedirs(directory)
+            streams[partition_dir] = self.sink.open_stream(os.path.join(directory, file_name))
+            return open_row_writer(streams[partition_dir], description, self.file_format,
+                                   self.compression, self.row_group_size)
+        
+        try:
+            start = time.perf_counter()
+            row_count = 0
+            with cursor.connection.cursor(name=f"export_{table_name}") as named_cursor:
+                named_cursor.execute(query)
+                rows = named_cursor.fetchmany(self.row_group_size)
+                query_seconds = time.perf_counter() - start
+                # Available once rows were fetched; the trailing partition values are not written
+                description = named_cursor.description[:len(named_cursor.description) - len(spec)]
+                router = PartitionRouter(spec, open_writer)
+                try:
+                    if not spec:
+                        router.writer()
+                    while rows:
+                        router.write_rows(rows)
+                        row_count += len(rows)
+                        fetch_start = time.perf_counter()
+                        rows = named_cursor.fetchmany(self.row_group_size)
+                        query_seconds += time.perf_counter() - fetch_start
+                finally:
+                    router.close()
+            
+            for stream in streams.values():
+                stream.commit()
+            # Rows go straight into the sink streams, so serialization includes the transfer
+            self.metrics.record(table_name, 'query', query_seconds, rows=row_count)
+            self.metrics.record(
+                table_name, 'serialize', time.perf_counter() - start - query_seconds,
+                size=sum(stream.bytes_written for stream in streams.values())
+            )
+            return router.partitions
+        finally:
+            # Discards every file that was not committed
+            for stream in streams.values():
+                stream.close()
+    
+    def _copy_to_hdfs(self, cursor, table_name, columns, block_range, hdfs_file_path):
+        """
+        Pipe COPY ... TO STDOUT of a table or one block range of it into a file in HDFS.
+        
+        The bytes pass through the text codec if one is set and go into a sink
+        stream (the stdin of ``hdfs dfs -put -`` by default) in chunks of
+        ``buffer_size`` bytes, so memory use does not depend on the size of the data.
+        """
+        stream = self.sink.open_stream(hdfs_file_path)
+        try:
+            # Query, CSV rendering and transfer overlap in a COPY, so they are one stage
+            with self.metrics.stage(table_name, 'copy') as counts:
+                with compressed(stream, self.compression) as out:
+                    cursor.copy_expert(
+                        self._copy_query(table_name, columns, block_range), out, size=self.buffer_size
+                    )
+                stream.commit()
+                counts['rows'] = cursor.rowcount
+                counts['bytes'] = stream.bytes_written
+        finally:
+            # Discards the file unless it was committed
+            stream.close()
+    
+    def _stream_to_hdfs(self, cursor, table_name, columns, block_range, file_name):
+        """
+        Stream a table or one block range of it into ``file_name`` in the table's _tmp directory.
+        
+        Unpartitioned CSV goes through _copy_to_hdfs, the fastest path; columnar
+        formats and partitioned tables through _write_rows. Once written, the
+        file is checkpointed with the partition directories it went to.
+        
+        Args:
+            cursor: Open cursor on the connection to read from
+            table_name (str): Name of the table
+            columns (list): (column_name, data_type) tuples of the table
+            block_range (tuple): ctid block range to export
+            file_name (str): Name of the file in the table or partition directory
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        hdfs_file_path = os.path.join(self._tmp_path(table_name), file_name)
+        
+        try:
+            if self.file_format == 'csv' and table_name not in self.partition_by:
+                self._copy_to_hdfs(cursor, table_name, columns, block_range, hdfs_file_path)
+                partitions = ['']
+            else:
+                partitions = self._write_rows(cursor, table_name, columns, block_range, file_name)
+        except RuntimeError as e:
+            print(f"Error loading {hdfs_file_path} to HDFS: {e}")
+            return False
+        
+        self.checkpoints.add_chunk(table_name, file_name, partitions=partitions)
+        return True
+    
+    def _copy_query(self, table_name, columns, block_range=(0, None)):
+        """Build the COPY ... TO STDOUT statement for a table or one block range of it."""
+        query = sql.SQL("SELECT {} FROM {}").format(
+            build_select_list(columns), sql.Identifier(table_name)
+        )
+        condition = ctid_range_condition(block_range)
+        if condition is not None:
+            query = sql.SQL("{} WHERE {}").format(query, sql.SQL(condition))
+        return sql.SQL("COPY ({}) TO STDOUT WITH CSV HEADER").format(query)
+    
+    def _stream_range_to_hdfs(self, table_name, columns, snapshot, part, block_range):
+        """
+        Stream one block range of a table into its own part file.
+        
+        The range is read inside the exported snapshot, so all parts together
+        form one consistent copy of the table.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        conn = self._get_postgres_connection()
+        try:
+            conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+            with conn.cursor() as cursor:
+                cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+                return self._stream_to_hdfs(
+                    cursor, table_name, columns, block_range, f"part-{part:05d}{self.file_extension}"
+                )
+        finally:
+            conn.close()
+    
+    def _tmp_path(self, table_name):
+        """HDFS directory collecting a table's files until they are published, outside every table directory."""
+        return os.path.join(self.hdfs_path, '_tmp', table_name)
+    
+    def _start_run(self, table_name):
+        """
+        Continue the unfinished export of a table, or start a new one.
+        
+        An unfinished export is continued while the table is unchanged since
+        it started (see pg_catalog.table_fingerprint) and the file format is
+        the same, keeping the files it committed to the _tmp directory; an
+        export stopped during its publish is always finished. Otherwise the
+        _tmp directory is emptied and the table's block ranges planned anew.
+        
+        Args:
+            table_name (str): Name of the table to export
+            
+        Returns:
+            dict: The run's checkpoint, see checkpoints.ChunkCheckpoints
+        """
+        conn = self._get_postgres_connection()
+        try:
+            with conn.cursor() as cursor:
+                fingerprint = table_fingerprint(cursor, table_name)
+                checkpoint = self.checkpoints.get(table_name)
+                if checkpoint is not None and (checkpoint.get('publishing') or (
+                    checkpoint['fingerprint'] == fingerprint and checkpoint['file_extension'] == self.file_extension
+                )):
+                    print(f"Continuing the interrupted export of {table_name}, "
+                          f"{len(checkpoint['chunks'])} files already written")
+                    return checkpoint
+                
+                ranges = [(0, None)]
+                if self.partition_rows and self._streams(table_name):
+                    ranges = plan_ctid_ranges(cursor, table_name, self.partition_rows, self.max_partitions)
+        finally:
+            conn.close()
+        
+        tmp_path = self._tmp_path(table_name)
+        self.sink.delete(tmp_path, recursive=True)
+        self.sink.makedirs(tmp_path)
+        self.checkpoints.start(
+            table_name, time.strftime('%Y%m%d_%H%M%S'), fingerprint=fingerprint,
+            file_extension=self.file_extension, ranges=ranges
+        )
+        return self.checkpoints.get(table_name)
+    
+    def _publish(self, table_name):
+        """
+        Replace the table directory with the table's _tmp directory.
+        
+        The old directory is renamed to ``_tmp/<table>.old`` and the new one into
+        its place, so readers see either the old or the new files, never a mix
+        or a partial file. The backup is only deleted once the new directory is
+        in place, and a publish interrupted between the two renames (no table
+        directory, backup and _tmp still there) is finished by running it again.
+        """
+        hdfs_table_path = os.path.normpath(os.path.join(self.hdfs_path, table_name))
+        tmp_path = os.path.normpath(self._tmp_path(table_name))
+        old_path = f"{tmp_path}.old"
+        with self.metrics.stage(table_name, 'publish'):
+            entries = {os.path.normpath(path) for path in self.sink.list(os.path.dirname(tmp_path))}
+            table_exists = hdfs_table_path in {
+                os.path.normpath(path) for path in self.sink.list(os.path.dirname(hdfs_table_path))
+            }
+            if tmp_path in entries:
+                if table_exists:
+                    if old_path in entries:
+                        # Backup of an earlier publish, older than the current table directory
+                        self.sink.delete(old_path, recursive=True)
+                    self.sink.rename(hdfs_table_path, old_path)
+                    entries.add(old_path)
+                try:
+                    self.sink.rename(tmp_path, hdfs_table_path)
+                except RuntimeError:
+                    # Put the old files back rather than leave the table without a directory
+                    if old_path in entries:
+                        self.sink.rename(old_path, hdfs_table_path)
+                    raise
+            elif old_path in entries and not table_exists:
+                # A failed rollback left only the backup: restore it
+                self.sink.rename(old_path, hdfs_table_path)
+                return
+            if old_path in entries:
+                self.sink.delete(old_path, recursive=True)
+    
+    def _streams(self, table_name):
+        """Whether a table is streamed into HDFS rather than staged as a CSV file on the host."""
+        return self.streaming or self.file_format != 'csv' or self.compression or table_name in self.partition_by
+    
+    def _stream_table_to_hdfs(self, table_name, checkpoint):
+        """
+        Stream a PostgreSQL table into HDFS without any intermediate files.
+        
+        Tables with more than one block range in their checkpoint are streamed
+        concurrently into ``part-NNNNN.<format>`` files, one per range, skipping
+        the parts an interrupted export already wrote; smaller tables are
+        written as a single ``<table>.<format>``. Tables in partition_by get
+        these files in each of their partition directories.
+        
+        Args:
+            table_name (str): Name of the table to export
+            checkpoint (dict): The run's checkpoint, see _start_run
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        ranges = [tuple(block_range) for block_range in checkpoint['ranges']]
+        parts = [
+            part for part in range(len(ranges))
+            if f"part-{part:05d}{self.file_extension}" not in checkpoint['chunks']
+        ]
+        if len(ranges) > 1 and not parts:
+            return True
+        
+        conn = self._get_postgres_connection()
+        
+        try:
+            conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+            cursor = conn.cursor()
+            columns = get_columns(cursor, table_name)
+            
+            if len(ranges) == 1:
+                if checkpoint['chunks']:
+                    return True
+                return self._stream_to_hdfs(
+                    cursor, table_name, columns, (0, None), f"{table_name}{self.file_extension}"
+                )
+            
+            print(f"Streaming {table_name} in {len(ranges)} block ranges, {len(ranges) - len(parts)} already written")
+            cursor.execute("SELECT pg_export_snapshot()")
+            snapshot = cursor.fetchone()[0]
+            
+            # The snapshot can only be imported while this transaction stays open
+            with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+                results = list(pool.map(
+                    lambda part: self._stream_range_to_hdfs(table_name, columns, snapshot, part, ranges[part]),
+                    parts
+                ))
+            return all(results)
+            
+        finally:
+            conn.close()
+    
+    def _export_table(self, table):
+        """
+        Export a single table from PostgreSQL to HDFS.
+        
+        Files are written to the table's _tmp directory and checkpointed one by
+        one, then published together (see _publish). A failed export is
+        continued by the next one (see _start_run), so only the files that
+        were not finished are written again.
+        
+        Args:
+            table (str): Name of the table to export
+            
+        Returns:
+            str: Status message for the table
+        """
+        start = time.perf_counter()
+        try:
+            print(f"Exporting table: {table}")
+            
+            with self.profiler.profile(table):
+                checkpoint = self._start_run(table)
+                success = True
+                if not checkpoint.get('publishing'):
+                    if self._streams(table):
+                        success = self._stream_table_to_hdfs(table, checkpoint)
+                    elif not checkpoint['chunks']:
+                        # Step 1: Export table to CSV on the host
+                        host_csv_path = self._export_table_to_csv(table)
+                        
+                        # Step 2: Load CSV to HDFS
+                        success = self._load_csv_to_hdfs(table, host_csv_path)
+                
+                if success:
+                    # From here on a retry only has to finish the publish
+                    self.checkpoints.update(table, publishing=True)
+                    self._publish(table)
+                    chunks = self.checkpoints.get(table)['chunks']
+                    self.checkpoints.clear(table)
+                    partitions = {partition for chunk in chunks.values() for partition in chunk['partitions']}
+                    with self._partitions_lock:
+                        self.touched_partitions[table] = partitions
+            
+            if success:
+                self.metrics.record(table, 'total', time.perf_counter() - start)
+            return "SUCCESS" if success else "FAILED"
+            
+        except Exception as e:
+            print(f"Error exporting table {table}: {e}")
+            return f"FAILED: {str(e)}"
     
     def export_tables(self):
         """
         Export all configured tables from PostgreSQL to HDFS.
         
+        With max_workers > 1 the tables are exported concurrently, largest first,
+        so the biggest table does not end up starting last. The table directories
+        are created up front in a single sink call.
+        
+        Every stage of every table is recorded in metrics: 'query' (waiting on
+        Postgres), 'serialize' (rendering rows to files), 'upload' (plus the
+        sink's own steps, e.g. 'docker_cp' and 'hdfs_put'), 'copy' for COPY
+        streams, 'publish' (swapping the new files in), and 'total'; read them
+        with ``metrics.table(table)``.
+        
         Returns:
             dict: Dictionary with table names as keys and status messages as values
         """
-        results = {}
+        self.touched_partitions = {}
+        self.metrics.reset()
+        self.profiler.start_run('export')
+        try:
+            self.sink.makedirs(*[os.path.join(self.hdfs_path, table) for table in self.tables])
+            statuses = self._export_all()
+        finally:
+            self.sink.close()
+            self.profiler.finish_run()
+        self.metrics.write_textfile({table: status == "SUCCESS" for table, status in statuses.items()})
+        return statuses
+    
+    def _export_all(self):
+        """Export the tables sequentially or in a pool, see export_tables."""
+        if self.max_workers <= 1:
+            return {table: self._export_table(table) for table in self.tables}
         
-        for table in self.tables:
-            try:
-                print(f"Exporting table: {table}")
-                
-                # Step 1: Export table to CSV in container
-                container_csv_path = self._export_table_to_csv(table)
-                
-                # Step 2: Load CSV to HDFS
-                success = self._load_csv_to_hdfs(table, container_csv_path)
-                
-                results[table] = "SUCCESS" if success else "FAILED"
-                
-            except Exception as e:
-                results[table] = f"FAILED: {str(e)}"
-                print(f"Error exporting table {table}: {e}")
+        conn = self._get_postgres_connection()
+        try:
+            with conn.cursor() as cursor:
+                ordered_tables = order_by_size(cursor, self.tables)
+        finally:
+            conn.close()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            statuses = dict(zip(ordered_tables, pool.map(self._export_table, ordered_tables)))
+        
+        return {table: statuses[table] for table in self.tables}
+    
+    def add_partition_statements(self):
+        """
+        Build the Hive DDL registering the partitions written by the last export.
         
-        return results
\ No newline at end of file
+        Returns:
+            list: One ALTER TABLE ... ADD IF NOT EXISTS PARTITION statement per
+                partitioned table
+        """
+        statements = []
+        for table, partitions in self.touched_partitions.items():
+            statement = add_partition_statements(table, os.path.join(self.hdfs_path, table), partitions)
+            if statement:
+                statements.append(statement)
+        return statements
\ No newline at end of file
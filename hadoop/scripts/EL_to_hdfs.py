@@ -1,19 +1,67 @@
 import os
+import posixpath
+import shutil
+import time
 import psycopg2
-import pandas as pd
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from contextlib import contextmanager
+from itertools import chain
+from pg_catalog import order_by_size, plan_ctid_ranges, ctid_range_condition, get_primary_key, table_fingerprint
+from watermarks import WatermarkStore
+from checkpoints import ChunkCheckpoints
+from sinks import HdfsCliSink
+from text_codecs import text_extension
+from row_writers import open_row_writer
+from partitions import PartitionRouter, partition_select, add_partition_statements
+from stage_metrics import StageMetrics
+from profiling import TableProfiler
+from planner import plan_table
 
 class PostgresToHdfsExporter:
-    def __init__(self, pg_config, hdfs_path, tables, hdfs_container, container_temp_dir):
+    def __init__(self, pg_config, hdfs_path, tables, hdfs_container, container_temp_dir, itersize=10000,
+                 max_workers=1, partition_rows=1000000, max_partitions=8, file_format='csv',
+                 compression=None, row_group_size=100000, watermark_path=None, sink=None,
+                 partition_by=None, metrics=None, profile_dir=None, chunk_rows=None, checkpoint_path=None):
         self.pg_config = pg_config
         self.hdfs_path = hdfs_path.rstrip('/')
         self.tables = tables
         self.hdfs_container = hdfs_container
         self.container_temp_dir = container_temp_dir
-        self.last_extract_dir = "/Users/mohamedmoaaz/Desktop/hive/last_extracts"
-        os.makedirs(self.last_extract_dir, exist_ok=True)
+        self.itersize = itersize
+        self.max_workers = max_workers
+        self.partition_rows = partition_rows
+        self.max_partitions = max_partitions
+        self.file_format = file_format
+        self.file_extension = f".{file_format}"
+        # For CSV, compression is a text codec named by the file suffix (.csv.gz), which is how Hive detects it
+        if file_format == 'csv':
+            self.file_extension += text_extension(compression)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.last_extract_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'last_extracts')
+        # Any sinks.Sink; the default goes through hdfs dfs in the container
+        self.sink = sink or HdfsCliSink(hdfs_container, container_temp_dir)
+        self.watermarks = WatermarkStore(
+            watermark_path or os.path.join(self.last_extract_dir, 'watermarks.json'),
+            legacy_dir=self.last_extract_dir
+        )
+        # Rows per chunk file of a keyed single-query extract; block range parts are chunks of their own
+        self.chunk_rows = chunk_rows
+        # Chunks committed to _tmp by unfinished runs, so a retry picks up after the last one
+        self.checkpoints = ChunkCheckpoints(
+            checkpoint_path or os.path.join(self.last_extract_dir, 'chunk_checkpoints.json')
+        )
+        # {table: [(partition_column, sql_expression), ...]}, see partitions.year_month_partitions
+        self.partition_by = partition_by or {}
+        # {table: [partition dir, ...]} written by the last export
+        self.touched_partitions = {}
+        # {table: planner.TablePlan} chosen by the last export with incremental='auto'
+        self.plans = {}
+        # Per-table stage timings; pass a StageMetrics with output paths to get JSON lines / a .prom file
+        self.metrics = metrics or StageMetrics('export')
+        # Per-table cProfile, flamegraph stacks and tracemalloc reports when a directory is given
+        self.profiler = TableProfiler(profile_dir)
 
     @contextmanager
     def _db_connection(self):
@@ -23,107 +71,413 @@ class PostgresToHdfsExporter:
         finally:
             conn.close()
 
-    def _run_docker_cmd(self, cmd):
-        try:
-            subprocess.run(
-                f"docker exec {self.hdfs_container} {cmd}",
-                shell=True,
-                check=True,
-                capture_output=True,
-                text=True
-            )
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Command failed: {cmd}\nError: {e.stderr}")
-
-    def _get_last_extract(self, table):
-        time_file = os.path.join(self.last_extract_dir, f"{table}_last_extract.txt")
-        if os.path.exists(time_file):
-            with open(time_file, 'r') as f:
-                return f.read().strip()
-        return '1970-01-01 00:00:00'
+    def _get_key_columns(self, table, conn):
+        # Rows are exported in (updated_at, primary key) order so the last row exported
+        # is an exact resume point, even when many rows share one updated_at
+        with conn.cursor() as cur:
+            return ['updated_at'] + get_primary_key(cur, table)
 
-    def _update_last_extract(self, table):
-        with open(os.path.join(self.last_extract_dir, f"{table}_last_extract.txt"), 'w') as f:
-            f.write(datetime.utcnow().isoformat())
+    def _select(self, table):
+        # Partition values ride along as trailing columns and are stripped when the rows are written
+        return f"SELECT *{partition_select(self.partition_by.get(table, []))} FROM {table}"
 
-    def _get_incremental_query(self, table, conn):
-        last_time = self._get_last_extract(table)
+    def _get_incremental_query(self, table, key_columns, after=None):
+        # after: key of the last row committed by this run, to read the next chunk from
+        order_by = ", ".join(key_columns)
+        if after is not None:
+            watermark = {'key_columns': key_columns, 'values': after}
+        else:
+            watermark = self.watermarks.get(table)
+            print(f"Last watermark for {table}: {watermark['values'] if watermark else None}")
         
-        print(f"\nDEBUG for {table}:")
-        print(f"Last extraction time: {last_time}")
+        if watermark is None:
+            return f"{self._select(table)} WHERE updated_at IS NOT NULL ORDER BY {order_by}", ()
         
-        with conn.cursor() as cur:
-            cur.execute(f"SELECT MAX(updated_at) FROM {table}")
-            max_db_time = cur.fetchone()[0]
-            print(f"Max updated_at in DB: {max_db_time}")
+        if watermark['key_columns'] != key_columns:
+            # Watermark from the old timestamp files, or the primary key changed
+            return f"{self._select(table)} WHERE updated_at > %s ORDER BY {order_by}", (watermark['values'][0],)
         
-        return f"SELECT * FROM {table} WHERE updated_at > %s ORDER BY updated_at"
+        placeholders = ", ".join(["%s"] * len(key_columns))
+        return (
+            f"{self._select(table)} WHERE ({order_by}) > ({placeholders}) ORDER BY {order_by}",
+            tuple(watermark['values'])
+        )
 
-    def _process_table(self, table, conn, incremental):
-        local_csv = f"{table}.csv"
-        container_csv = f"{self.container_temp_dir}/{table}.csv"
+    def _iter_batches(self, cur, fetch_seconds):
+        # fetch_seconds[0] accumulates the time spent waiting on Postgres
+        while True:
+            start = time.perf_counter()
+            rows = cur.fetchmany(self.itersize)
+            fetch_seconds[0] += time.perf_counter() - start
+            if not rows:
+                break
+            yield rows
+
+    def _drop_header_rows(self, batches, colnames):
+        # Source data that was itself loaded from CSV can contain repeated header lines
+        header = set(colnames)
+        width = len(colnames)
+        for rows in batches:
+            yield [row for row in rows if not all(str(v).strip() in header for v in row[:width])]
+
+    def _write_files(self, table, local_dir, file_name, description, batches, write_empty):
+        # Each partition gets local_dir/<partition dir>/file_name; unpartitioned tables use local_dir itself
+        spec = self.partition_by.get(table, [])
+        description = description[:len(description) - len(spec)]
+        
+        def open_writer(partition_dir):
+            os.makedirs(os.path.join(local_dir, partition_dir), exist_ok=True)
+            return open_row_writer(
+                os.path.join(local_dir, partition_dir, file_name), description,
+                self.file_format, self.compression, self.row_group_size
+            )
         
+        row_count = 0
+        router = PartitionRouter(spec, open_writer)
         try:
-            # Build and execute query
-            if incremental:
-                query = self._get_incremental_query(table, conn)
-                last_time = self._get_last_extract(table)
-                print(f"Using incremental query for {table}")
-                
-                # Use cursor directly to avoid pandas warning
-                with conn.cursor() as cur:
-                    cur.execute(query, (last_time,))
-                    rows = cur.fetchall()
-                    colnames = [desc[0] for desc in cur.description]
-            else:
-                with conn.cursor() as cur:
-                    cur.execute(f"SELECT * FROM {table}")
-                    rows = cur.fetchall()
-                    colnames = [desc[0] for desc in cur.description]
+            if write_empty and not spec:
+                router.writer()
+            for rows in self._drop_header_rows(batches, [desc[0] for desc in description]):
+                router.write_rows(rows)
+                row_count += len(rows)
+        finally:
+            router.close()
+        return row_count, router.partitions
+
+    def _extract_to_file(self, conn, cursor_name, table, query, params, local_dir, file_name,
+                         write_empty=True, key_columns=None):
+        start = time.perf_counter()
+        fetch_seconds = [0.0]
+        # Server-side cursor: rows arrive in batches of itersize instead of all at once
+        with conn.cursor(name=cursor_name) as cur:
+            cur.itersize = self.itersize
+            cur.execute(query, params)
+            fetch_seconds[0] += time.perf_counter() - start
+            batches = self._iter_batches(cur, fetch_seconds)
+            first_batch = next(batches, [])
             
-            # Create DataFrame
-            df = pd.DataFrame(rows, columns=colnames)
+            if not first_batch and not write_empty:
+                self.metrics.record(table, 'query', fetch_seconds[0], rows=0)
+                return 0, None, []
             
-            if incremental:
-                if df.empty:
-                    print(f"No new records found in {table} (last extract: {self._get_last_extract(table)})")
-                    return f"No new records in {table}"
-                print(f"Found {len(df)} new records in {table}")
-
-            # Export to CSV - ensure no header rows in data
-            df = df[~df.apply(lambda row: row.astype(str).str.strip().isin(df.columns).all(), axis=1)]
-            df.to_csv(local_csv, index=False)
+            last_row = []
             
-            # Transfer to HDFS
-            hdfs_file = f"{table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            hdfs_path = f"{self.hdfs_path}/{table}/{hdfs_file}"
+            def remember_last_row(batches):
+                for rows in batches:
+                    last_row[:] = rows[-1:]
+                    yield rows
             
-            subprocess.run(f"docker cp {local_csv} {self.hdfs_container}:{container_csv}", shell=True, check=True)
-            self._run_docker_cmd(f"hdfs dfs -mkdir -p {self.hdfs_path}/{table}")
-            self._run_docker_cmd(f"hdfs dfs -put -f {container_csv} {hdfs_path}")
+            row_count, partitions = self._write_files(
+                table, local_dir, file_name, cur.description,
+                remember_last_row(chain([first_batch], batches)), write_empty
+            )
+            # Fetching and writing alternate; the time not spent fetching went into serialization
+            self.metrics.record(table, 'query', fetch_seconds[0], rows=row_count)
+            self.metrics.record(
+                table, 'serialize', time.perf_counter() - start - fetch_seconds[0],
+                size=self._local_bytes(local_dir, file_name)
+            )
             
-            if incremental and not df.empty:
-                self._update_last_extract(table)
-                
-            return f"Exported {len(df)} records to {hdfs_path}"
+            # Key of the last row written, i.e. the new watermark when rows are in key order
+            last_key = None
+            if key_columns and last_row:
+                colnames = [desc[0] for desc in cur.description]
+                last_key = tuple(last_row[0][colnames.index(column)] for column in key_columns)
+            return row_count, last_key, partitions
+
+    def _local_bytes(self, local_dir, file_name):
+        return sum(
+            os.path.getsize(os.path.join(root, file_name))
+            for root, _, files in os.walk(local_dir) if file_name in files
+        )
+
+    def _upload(self, table, local_dir, file_names, directory):
+        # One upload per partition directory, after a single call creating them
+        partitions = sorted({
+            os.path.relpath(root, local_dir).replace(os.sep, '/')
+            for root, _, files in os.walk(local_dir) if set(files) & set(file_names)
+        })
+        self.sink.makedirs(*[directory if partition == '.' else f"{directory}/{partition}" for partition in partitions])
+        for partition in partitions:
+            local_files = [
+                os.path.join(local_dir, partition, file_name) for file_name in file_names
+                if os.path.exists(os.path.join(local_dir, partition, file_name))
+            ]
+            with self.metrics.stage(table, 'upload') as counts:
+                counts['bytes'] = sum(os.path.getsize(local_file) for local_file in local_files)
+                steps = self.sink.upload(local_files, directory if partition == '.' else f"{directory}/{partition}")
+            # e.g. docker_cp and hdfs_put for the container sink
+            for step, seconds in (steps or {}).items():
+                self.metrics.record(table, step, seconds)
+
+    def _commit_chunk(self, table, local_dir, tmp_dir, file_name, row_count, last_key, partitions):
+        # A chunk is committed once it is in _tmp; a retry of the run skips it
+        if partitions:
+            self._upload(table, local_dir, [file_name], tmp_dir)
+        self.checkpoints.add_chunk(table, file_name, rows=row_count, last_key=last_key, partitions=partitions)
+        for root, _, files in os.walk(local_dir):
+            if file_name in files:
+                os.remove(os.path.join(root, file_name))
+
+    def _publish(self, table, tmp_dir, chunks, resumed=False):
+        # Every chunk is renamed into place, so readers see whole files or none; one sink call per directory
+        table_dir = f"{self.hdfs_path}/{table}"
+        moves = {}
+        for file_name, chunk in chunks.items():
+            for partition in chunk['partitions']:
+                moves.setdefault(partition, []).append(f"{tmp_dir}/{partition}/{file_name}" if partition else f"{tmp_dir}/{file_name}")
+        with self.metrics.stage(table, 'publish'):
+            if any(moves):
+                self.sink.makedirs(*[f"{table_dir}/{partition}" for partition in moves if partition])
+            for partition, sources in moves.items():
+                if resumed:
+                    # The interrupted publish may have moved some of them already
+                    present = {path for path, _ in self.sink.list_files(posixpath.dirname(sources[0]))}
+                    sources = [source for source in sources if source in present]
+                self.sink.move(sources, f"{table_dir}/{partition}" if partition else table_dir)
+            self.sink.delete(tmp_dir, recursive=True)
+
+    def _finish_run(self, table, checkpoint, resumed=False):
+        chunks = checkpoint['chunks']
+        self._publish(table, f"{self.hdfs_path}/{table}/_tmp", chunks, resumed)
+        # Only advance the watermark once the data is published, so a failed run is retried
+        last_keys = [chunk['last_key'] for chunk in chunks.values() if chunk['last_key'] is not None]
+        if checkpoint['key_columns'] and last_keys:
+            # Chunks are ordered on their own; the watermark is the largest last key of all
+            self.watermarks.set(table, checkpoint['key_columns'], max(last_keys))
+        self.checkpoints.clear(table)
+        return (
+            sum(chunk['rows'] for chunk in chunks.values()),
+            sorted(set(chain.from_iterable(chunk['partitions'] for chunk in chunks.values())))
+        )
+
+    def _range_query(self, query, block_range):
+        condition = ctid_range_condition(block_range)
+        if condition is None:
+            return query
+        if " WHERE " in query:
+            return query.replace(" WHERE ", f" WHERE {condition} AND ", 1)
+        return f"{query} WHERE {condition}"
+
+    def _extract_range(self, table, query, params, snapshot, local_dir, file_name, block_range, key_columns):
+        with self._db_connection() as conn:
+            # Read from the coordinator's snapshot so all parts see the same table state
+            conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+            return self._extract_to_file(
+                conn, f"extract_{file_name}", table, self._range_query(query, block_range),
+                params, local_dir, file_name, write_empty=False, key_columns=key_columns
+            )
+
+    def _process_table_ranges(self, table, query, params, ranges, local_dir, run_stamp, key_columns, chunks):
+        file_names = [f"{table}_{run_stamp}_part-{part:05d}{self.file_extension}" for part in range(len(ranges))]
+        # Parts committed by an interrupted run of the same table state are kept
+        parts = [part for part in range(len(ranges)) if file_names[part] not in chunks]
+        print(f"Extracting {table} in {len(ranges)} block ranges, {len(ranges) - len(parts)} already committed")
+        if not parts:
+            return
+        
+        def extract_part(part):
+            row_count, last_key, partitions = self._extract_range(
+                table, query, params, snapshot, local_dir, file_names[part], ranges[part], key_columns
+            )
+            # Empty ranges produce no file, but are committed all the same
+            self._commit_chunk(
+                table, local_dir, f"{self.hdfs_path}/{table}/_tmp", file_names[part], row_count, last_key, partitions
+            )
+        
+        with self._db_connection() as snapshot_conn:
+            snapshot_conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+            with snapshot_conn.cursor() as cur:
+                cur.execute("SELECT pg_export_snapshot()")
+                snapshot = cur.fetchone()[0]
             
+            # The snapshot stays importable only while this transaction is open
+            with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+                list(pool.map(extract_part, parts))
+
+    def _process_table_chunks(self, table, conn, local_dir, run_stamp, key_columns, chunks):
+        tmp_dir = f"{self.hdfs_path}/{table}/_tmp"
+        if key_columns is None:
+            # A full query has nothing to resume from: its single chunk is redone unless committed
+            if not chunks:
+                file_name = f"{table}_{run_stamp}{self.file_extension}"
+                row_count, _, partitions = self._extract_to_file(
+                    conn, f"extract_{table}", table, self._select(table), None, local_dir, file_name
+                )
+                self._commit_chunk(table, local_dir, tmp_dir, file_name, row_count, None, partitions)
+            return
+        
+        # Keyed extracts continue after the last committed key, chunk_rows rows per query if set
+        last_key = max((chunk['last_key'] for chunk in chunks.values()), default=None)
+        if last_key is not None:
+            print(f"Resuming {table} after {last_key}, {len(chunks)} chunks already committed")
+        chunk = len(chunks)
+        while True:
+            query, params = self._get_incremental_query(table, key_columns, last_key)
+            suffix = ''
+            if self.chunk_rows:
+                query = f"{query} LIMIT {int(self.chunk_rows)}"
+            if self.chunk_rows or chunk:
+                suffix = f"_chunk-{chunk:05d}"
+            file_name = f"{table}_{run_stamp}{suffix}{self.file_extension}"
+            row_count, last_key, partitions = self._extract_to_file(
+                conn, f"extract_{table}", table, query, params, local_dir, file_name,
+                write_empty=False, key_columns=key_columns
+            )
+            if not row_count:
+                return
+            self._commit_chunk(table, local_dir, tmp_dir, file_name, row_count, last_key, partitions)
+            if not self.chunk_rows:
+                return
+            chunk += 1
+
+    def _start_run(self, table, conn, key_columns, ranges):
+        # Returns the table's run: the interrupted one if it can be continued, else a new one
+        with conn.cursor() as cur:
+            fingerprint = table_fingerprint(cur, table)
+        checkpoint = self.checkpoints.get(table)
+        if checkpoint is not None:
+            # A keyed query resumes after its last key whatever changed since; block ranges
+            # only line up with the committed parts while the table is unchanged
+            if checkpoint['key_columns'] == key_columns and (
+                len(checkpoint['ranges']) == 1 or checkpoint['fingerprint'] == fingerprint
+            ):
+                print(f"Continuing the interrupted run {checkpoint['run']} of {table}")
+                return checkpoint
+            # Leftovers of a run that cannot be continued
+            self.sink.delete(f"{self.hdfs_path}/{table}/_tmp", recursive=True)
+        run_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.checkpoints.start(table, run_stamp, key_columns=key_columns, ranges=ranges, fingerprint=fingerprint)
+        return self.checkpoints.get(table)
+
+    def _process_table(self, table, conn, incremental):
+        checkpoint = self.checkpoints.get(table)
+        if checkpoint is not None and checkpoint.get('publishing'):
+            # The last run stopped halfway through its publish: finish it before a new one starts
+            print(f"Finishing the publish of run {checkpoint['run']} of {table}")
+            self._finish_run(table, checkpoint, resumed=True)
+        
+        plan = None
+        if incremental == 'auto':
+            # Let catalog statistics pick full, index-driven incremental or ranged per table
+            with conn.cursor() as cur:
+                plan = plan_table(cur, table, self.watermarks.get(table), self.partition_rows)
+            self.plans[table] = plan
+            print(f"Plan for {table}: {plan.strategy} ({plan.reason})")
+            if plan.missing_index:
+                print(f"Suggested index: {plan.missing_index}")
+            incremental = plan.incremental
+        
+        key_columns = self._get_key_columns(table, conn) if incremental else None
+        ranges = [(0, None)]
+        # An index-driven incremental query reads the delta in one ordered scan
+        if self.partition_rows and not (plan and plan.strategy == 'incremental'):
+            with conn.cursor() as cur:
+                ranges = plan_ctid_ranges(cur, table, self.partition_rows, self.max_partitions)
+        
+        # Chunks are committed to the table's _tmp directory, which Hive skips, and published together
+        checkpoint = self._start_run(table, conn, key_columns, ranges)
+        run_stamp = checkpoint['run']
+        ranges = [tuple(block_range) for block_range in checkpoint['ranges']]
+        # Local staging directory, laid out like the table directory in HDFS
+        local_dir = f"{table}_{run_stamp}"
+        
+        try:
+            # Large tables are extracted and transferred in parallel block ranges
+            if len(ranges) > 1:
+                if incremental:
+                    query, params = self._get_incremental_query(table, key_columns)
+                    print(f"Using incremental query for {table}")
+                else:
+                    query, params = self._select(table), None
+                self._process_table_ranges(
+                    table, query, params, ranges, local_dir, run_stamp, key_columns, checkpoint['chunks']
+                )
+            else:
+                if incremental:
+                    print(f"Using incremental query for {table}")
+                self._process_table_chunks(table, conn, local_dir, run_stamp, key_columns, checkpoint['chunks'])
         finally:
-            if os.path.exists(local_csv):
-                os.remove(local_csv)
-            self._run_docker_cmd(f"rm -f {container_csv}")
+            shutil.rmtree(local_dir, ignore_errors=True)
+        
+        checkpoint = self.checkpoints.get(table)
+        if incremental and not any(chunk['rows'] for chunk in checkpoint['chunks'].values()):
+            self.checkpoints.clear(table)
+            self.sink.delete(f"{self.hdfs_path}/{table}/_tmp", recursive=True)
+            print(f"No new records found in {table}")
+            return f"No new records in {table}"
+        
+        # From here on a retry only has to finish moving the chunks into place
+        self.checkpoints.update(table, publishing=True)
+        row_count, partitions = self._finish_run(table, checkpoint)
+        if incremental:
+            print(f"Found {row_count} new records in {table}")
+        
+        if table in self.partition_by:
+            self.touched_partitions[table] = partitions
+            return f"Exported {row_count} records to {len(partitions)} partitions of {self.hdfs_path}/{table}"
+        file_names = sorted(checkpoint['chunks'])
+        file_name = file_names[0] if len(file_names) == 1 else f"{table}_{run_stamp}*{self.file_extension}"
+        return f"Exported {row_count} records to {self.hdfs_path}/{table}/{file_name}"
+
+    def add_partition_statements(self):
+        # Hive DDL registering the partitions written by the last export
+        statements = []
+        for table, partitions in self.touched_partitions.items():
+            statement = add_partition_statements(table, f"{self.hdfs_path}/{table}", partitions)
+            if statement:
+                statements.append(statement)
+        return statements
+
+    def _export_table(self, table, incremental, conn=None):
+        print(f"\nProcessing {table}...")
+        try:
+            with self.metrics.stage(table, 'total'), self.profiler.profile(table):
+                if conn is None:
+                    # Parallel workers each use their own connection
+                    with self._db_connection() as conn:
+                        status = self._process_table(table, conn, incremental)
+                else:
+                    status = self._process_table(table, conn, incremental)
+            print(f"✓ {status}")
+        except Exception as e:
+            status = f"Failed: {str(e)}"
+            print(f"✗ {table}: {status}")
+        return status
 
     def export_tables(self, incremental=True):
-        results = {}
-        self._run_docker_cmd(f"mkdir -p {self.container_temp_dir}")
+        # incremental: True, False, or 'auto' to let planner.plan_table choose per table
+        # {table: status message}; per-stage totals are in self.metrics.table(table)
+        self.touched_partitions = {}
+        self.plans = {}
+        self.metrics.reset()
+        self.profiler.start_run('export')
+        try:
+            # One sink call creates every table directory
+            self.sink.makedirs(*[f"{self.hdfs_path}/{table}" for table in self.tables])
+            statuses = self._export_all(incremental)
+        finally:
+            self.sink.close()
+            self.profiler.finish_run()
+        self.metrics.write_textfile({table: not status.startswith('Failed') for table, status in statuses.items()})
+        return statuses
+
+    def _export_all(self, incremental):
+        if self.max_workers <= 1:
+            with self._db_connection() as conn:
+                return {table: self._export_table(table, incremental, conn) for table in self.tables}
         
+        # Start the largest tables first so they don't become the tail of the run
         with self._db_connection() as conn:
-            for table in self.tables:
-                print(f"\nProcessing {table}...")
-                try:
-                    results[table] = self._process_table(table, conn, incremental)
-                    print(f"✓ {results[table]}")
-                except Exception as e:
-                    results[table] = f"Failed: {str(e)}"
-                    print(f"✗ {results[table]}")
-        
-        return results
\ No newline at end of file
+            with conn.cursor() as cur:
+                ordered_tables = order_by_size(cur, self.tables)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            statuses = dict(zip(
+                ordered_tables,
+                pool.map(lambda table: self._export_table(table, incremental), ordered_tables)
+            ))
+        
+        return {table: statuses[table] for table in self.tables}
\ No newline at end of file
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+
+
+def _to_json(value):
+    # Keys of the last rows hold timestamps, which Postgres reads back from ISO strings
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+class ChunkCheckpoints:
+    def __init__(self, path):
+        """
+        Progress of chunked exports, kept in a single JSON file.
+
+        An export writes each table as a series of chunk files into a ``_tmp``
+        directory of the sink and records every chunk here once the sink has it,
+        with what a retry needs to carry on after it (rows, partitions, the key
+        of its last row). A failed run is resumed from its last recorded chunk
+        instead of from scratch; once the chunks are published the table's entry
+        is cleared. Like WatermarkStore, the file is rewritten through a temp
+        file and os.replace.
+
+        Args:
+            path (str): Location of the JSON file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def _write(self, checkpoints):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoints, f, indent=2, sort_keys=True, default=_to_json)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def get(self, table):
+        """
+        Return the unfinished run of a table.
+
+        Returns:
+            dict: ``{'run': run id, 'chunks': {chunk: {...}}, ...}`` with the state
+                given to start, or None if the last run of the table completed
+        """
+        with self._lock:
+            return self._read().get(table)
+
+    def start(self, table, run, **state):
+        """Begin a new run of a table, dropping any unfinished one."""
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[table] = dict(state, run=run, chunks={})
+            self._write(checkpoints)
+
+    def update(self, table, **state):
+        """Change the state of the current run of a table, e.g. to mark it as being published."""
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[table].update(state)
+            self._write(checkpoints)
+
+    def add_chunk(self, table, chunk, **info):
+        """Record a chunk of the current run of a table as safely in the sink."""
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[table]['chunks'][chunk] = info
+            self._write(checkpoints)
+
+    def clear(self, table):
+        """Forget the run of a table once it is published."""
+        with self._lock:
+            checkpoints = self._read()
+            if checkpoints.pop(table, None) is not None:
+                self._write(checkpoints)
@@ -0,0 +1,143 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# PostgreSQL type OIDs (cursor.description type_code) -> Arrow types
+PG_ARROW_TYPES = {
+    16: pa.bool_(),                      # boolean
+    20: pa.int64(),                      # bigint
+    21: pa.int16(),                      # smallint
+    23: pa.int32(),                      # integer
+    700: pa.float32(),                   # real
+    701: pa.float64(),                   # double precision
+    1082: pa.date32(),                   # date
+    1114: pa.timestamp('us'),            # timestamp
+    1184: pa.timestamp('us', tz='UTC'),  # timestamptz
+}
+NUMERIC_OID = 1700
+
+
+def arrow_type(column):
+    """
+    Map a psycopg2 cursor.description column to an Arrow type.
+
+    Constrained NUMERIC(p,s) becomes a decimal of the same precision and scale;
+    unconstrained NUMERIC and any type without a mapping are written as strings.
+
+    Args:
+        column: psycopg2 Column from cursor.description
+
+    Returns:
+        pa.DataType: Arrow type of the column
+    """
+    if column.type_code == NUMERIC_OID:
+        if column.precision is not None and 0 < column.precision <= 38:
+            return pa.decimal128(column.precision, column.scale)
+        return pa.string()
+    return PG_ARROW_TYPES.get(column.type_code, pa.string())
+
+
+def read_table(source, file_format):
+    """
+    Read a whole Parquet or ORC file into an Arrow table.
+
+    Args:
+        source: Readable binary file object; it is read to the end first, since
+            both formats need random access
+        file_format (str): 'parquet' or 'orc'
+
+    Returns:
+        pa.Table: Content of the file
+    """
+    buffer = pa.BufferReader(source.read())
+    if file_format == 'parquet':
+        return pq.read_table(buffer)
+    if file_format == 'orc':
+        from pyarrow import orc
+        return orc.read_table(buffer)
+    raise ValueError(f"Unsupported columnar format: {file_format}")
+
+
+class ColumnarWriter:
+    def __init__(self, sink, description, file_format='parquet', compression='snappy',
+                 row_group_size=100000):
+        """
+        Write rows fetched from a cursor as a Parquet or ORC file.
+
+        Rows are buffered until row_group_size of them are pending and then
+        written as one row group (Parquet) or one write batch (ORC, whose stripe
+        size is left to the ORC writer), so memory is bounded by one row group.
+
+        Args:
+            sink: Output path or writable binary file object (a pipe is fine)
+            description: cursor.description of the query producing the rows, or
+                the pa.Schema of the tables passed to write_table
+            file_format (str): 'parquet' or 'orc'
+            compression (str): Codec name, e.g. 'snappy', 'zstd' or 'none'
+            row_group_size (int): Number of rows per row group
+        """
+        if isinstance(description, pa.Schema):
+            self.schema = description
+        else:
+            self.schema = pa.schema([pa.field(column.name, arrow_type(column)) for column in description])
+        self.file_format = file_format
+        self.row_group_size = row_group_size
+        self._pending = []
+
+        if file_format == 'parquet':
+            # Hive 3 only reads Parquet timestamps stored as INT96
+            self._writer = pq.ParquetWriter(
+                sink, self.schema, compression=compression, use_deprecated_int96_timestamps=True
+            )
+        elif file_format == 'orc':
+            from pyarrow import orc
+            self._writer = orc.ORCWriter(
+                sink, compression='uncompressed' if compression == 'none' else compression
+            )
+        else:
+            raise ValueError(f"Unsupported columnar format: {file_format}")
+
+    def _to_table(self, rows):
+        columns = list(zip(*rows))
+        arrays = []
+        for field, values in zip(self.schema, columns):
+            if pa.types.is_string(field.type):
+                values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+    def _flush(self, rows):
+        self._write(self._to_table(rows))
+
+    def _write(self, table):
+        if self.file_format == 'parquet':
+            self._writer.write_table(table, row_group_size=table.num_rows)
+        else:
+            self._writer.write(table)
+
+    def write_rows(self, rows):
+        """Queue rows for writing, flushing every full row group."""
+        self._pending.extend(rows)
+        while len(self._pending) >= self.row_group_size:
+            self._flush(self._pending[:self.row_group_size])
+            del self._pending[:self.row_group_size]
+
+    def write_table(self, table):
+        """Write an Arrow table with the writer's schema, row_group_size rows at a time."""
+        if self._pending:
+            self._flush(self._pending)
+            self._pending = []
+        for batch in table.cast(self.schema).to_batches(max_chunksize=self.row_group_size):
+            self._write(pa.Table.from_batches([batch], schema=self.schema))
+
+    def close(self):
+        """Flush the remaining rows and write the file footer."""
+        if self._pending:
+            self._flush(self._pending)
+            self._pending = []
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
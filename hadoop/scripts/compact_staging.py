@@ -0,0 +1,36 @@
+from compaction import StagingCompactor
+from sinks import HdfsCliSink
+
+# Configuration
+TABLES = [
+    'aircraft',
+    'airports',
+    'fare_basis_codes',
+    'flights',
+    'passengers',
+    'promotions',
+    'reservations',
+    'sales_channels'
+]
+HDFS_PATH = '/user/hive/warehouse/staging/source'
+HDFS_CONTAINER = 'master1'
+CONTAINER_TEMP_DIR = '/tmp/csv_staging'
+MIN_FILES = 32
+TARGET_SIZE = 128 * 1024 * 1024
+
+# Create compactor instance
+with HdfsCliSink(HDFS_CONTAINER, CONTAINER_TEMP_DIR) as sink:
+    compactor = StagingCompactor(
+        sink=sink,
+        hdfs_path=HDFS_PATH,
+        tables=TABLES,
+        min_files = MIN_FILES,
+        target_size = TARGET_SIZE
+    )
+
+    # Compact tables
+    results = compactor.compact_tables()
+
+# Print results
+for table, status in results.items():
+    print(f"{table}: {status}")
@@ -0,0 +1,242 @@
+import json
+import posixpath
+import re
+import shutil
+from datetime import datetime
+
+from text_codecs import compressed, open_decompressor, text_extension
+
+# Hive skips files and directories starting with '_' or '.', so work files live here
+WORK_DIR = '_compaction'
+# Suffix of merged file names, stripped again when a merged file is merged once more
+_COMPACTED_SUFFIX = re.compile(r'_compacted_\d{8}_\d{6}_\d{6}_\d{5}$')
+
+
+class StagingCompactor:
+    def __init__(self, sink, hdfs_path, tables, file_format='csv', compression=None,
+                 min_files=32, target_size=128 * 1024 * 1024, row_group_size=100000):
+        """
+        Merge the small files that incremental exports leave in staging directories.
+
+        A table directory (or each of its ``key=value`` partition directories) is
+        compacted once it holds at least min_files files smaller than target_size.
+        Those files are merged, oldest first, into files of about target_size:
+        CSV by concatenation with the repeated headers dropped, Parquet and ORC
+        by rewriting their rows.
+
+        Each merged file is written to ``_compaction/`` and recorded there in a
+        JSON file listing its inputs. The inputs are then moved out of the
+        directory in one call and the merged file renamed in, so readers never
+        see a row twice, and the moved inputs are deleted. A merged file is named
+        after its oldest input, so file names keep sorting oldest first. A run
+        that dies half way is rolled forward from those records by the next run.
+        Only complete files that exist when the run starts are considered, so
+        new exports can land while it runs; run one compactor per directory at
+        a time.
+
+        Args:
+            sink (Sink): Storage holding the staging directories (see sinks)
+            hdfs_path (str): Base path of the table directories
+            tables (list): Tables to compact
+            file_format (str): 'csv', 'parquet' or 'orc', as written by the exporter
+            compression (str): The exporter's compression setting; for CSV it
+                selects the text codec and file suffix, for columnar formats the
+                codec of the merged files ('snappy' if None)
+            min_files (int): Number of small files that triggers a compaction
+            target_size (int): Size in bytes of the merged files
+            row_group_size (int): Rows per Parquet row group / ORC write batch
+        """
+        self.sink = sink
+        self.hdfs_path = hdfs_path.rstrip('/')
+        self.tables = tables
+        self.file_format = file_format
+        self.compression = compression
+        self.min_files = min_files
+        self.target_size = target_size
+        self.row_group_size = row_group_size
+        self.file_extension = f".{file_format}"
+        if file_format == 'csv':
+            self.file_extension += text_extension(compression)
+
+    def _partition_directories(self, directory):
+        """Return the directory itself and all ``key=value`` directories below it."""
+        files = {path for path, _ in self.sink.list_files(directory)}
+        directories = [directory]
+        for path in self.sink.list(directory):
+            if path not in files and '=' in posixpath.basename(path):
+                directories.extend(self._partition_directories(path))
+        return directories
+
+    def _small_files(self, directory):
+        return [
+            (path, size) for path, size in self.sink.list_files(f"{directory}/*{self.file_extension}")
+            if size < self.target_size and not posixpath.basename(path).startswith(('_', '.'))
+        ]
+
+    def _plan_groups(self, files):
+        """
+        Pack files, in name (i.e. export time) order, into groups of up to target_size bytes.
+
+        Returns:
+            list: Lists of (path, size) tuples; groups of a single file are dropped
+        """
+        groups = [[]]
+        group_size = 0
+        for path, size in files:
+            if groups[-1] and group_size + size > self.target_size:
+                groups.append([])
+                group_size = 0
+            groups[-1].append((path, size))
+            group_size += size
+        return [group for group in groups if len(group) > 1]
+
+    def _merge_csv(self, inputs, out):
+        with compressed(out, self.compression) as writer:
+            for index, path in enumerate(inputs):
+                with self.sink.open_input(path) as raw, open_decompressor(raw, self.compression) as reader:
+                    header = reader.readline()
+                    # Every input starts with the same header; the merged file keeps one
+                    if index == 0:
+                        writer.write(header)
+                    shutil.copyfileobj(reader, writer, 1024 * 1024)
+
+    def _merge_columnar(self, inputs, out):
+        # Imported here so pyarrow is only needed when a columnar format is selected
+        from columnar import ColumnarWriter, read_table
+
+        writer = None
+        for path in inputs:
+            # Inputs are small by definition, so each is read whole
+            with self.sink.open_input(path) as f:
+                table = read_table(f, self.file_format)
+            if writer is None:
+                writer = ColumnarWriter(out, table.schema, self.file_format,
+                                        self.compression or 'snappy', self.row_group_size)
+            writer.write_table(table)
+        writer.close()
+
+    def _write_record(self, record_path, record):
+        stream = self.sink.open_stream(record_path)
+        try:
+            stream.write(json.dumps(record, indent=2, sort_keys=True).encode())
+            stream.commit()
+        finally:
+            stream.close()
+
+    def _read_record(self, record_path):
+        with self.sink.open_input(record_path) as f:
+            return json.loads(f.read())
+
+    def _finish(self, record_path, record, resumed=False):
+        # Inputs leave the directory before the merged file enters it, so readers never
+        # see a row twice. Each step checks what an interrupted run already did.
+        directory = posixpath.dirname(record['output'])
+        inputs = record['inputs']
+        if resumed:
+            present = {path for path, _ in self.sink.list_files(directory)}
+            inputs = [path for path in inputs if path in present]
+        if inputs:
+            self.sink.makedirs(record['moved_inputs'])
+            self.sink.move(inputs, record['moved_inputs'])
+        if not resumed or self.sink.list_files(record['work_file']):
+            self.sink.rename(record['work_file'], record['output'])
+        self.sink.delete(record['moved_inputs'], recursive=True)
+        record['state'] = 'done'
+        record['finished_at'] = datetime.now().isoformat()
+        self._write_record(record_path, record)
+
+    def _recover(self, directory):
+        """Finish the compactions an earlier run left pending; their merged files are complete."""
+        work_dir = f"{directory}/{WORK_DIR}"
+        for record_path in self.sink.list(f"{work_dir}/*.json"):
+            record = self._read_record(record_path)
+            if record['state'] != 'pending':
+                continue
+            print(f"Finishing interrupted compaction into {record['output']}")
+            self._finish(record_path, record, resumed=True)
+        # Merged files whose record was never written
+        self.sink.delete(f"{work_dir}/*{self.file_extension}")
+
+    def _compact_group(self, directory, table, name, group):
+        inputs = [path for path, _ in group]
+        work_file = f"{directory}/{WORK_DIR}/{name}"
+        output = f"{directory}/{name}"
+        record_path = f"{work_file}.json"
+
+        stream = self.sink.open_stream(work_file)
+        try:
+            if self.file_format == 'csv':
+                self._merge_csv(inputs, stream)
+            else:
+                self._merge_columnar(inputs, stream)
+            stream.commit()
+        finally:
+            stream.close()
+
+        record = {
+            'table': table,
+            'state': 'pending',
+            'inputs': inputs,
+            'input_bytes': sum(size for _, size in group),
+            'output': output,
+            'output_bytes': self.sink.list_files(work_file)[0][1],
+            'work_file': work_file,
+            'moved_inputs': f"{work_file}.inputs",
+            'started_at': datetime.now().isoformat(),
+        }
+        self._write_record(record_path, record)
+        self._finish(record_path, record)
+        return record
+
+    def compact_directory(self, directory, table):
+        """
+        Compact one table or partition directory if it has enough small files.
+
+        Args:
+            directory (str): Directory holding the table's data files
+            table (str): Table name, used for the merged file names
+
+        Returns:
+            list: Records of the merges done, empty if below the threshold
+        """
+        self._recover(directory)
+
+        files = self._small_files(directory)
+        if len(files) < self.min_files:
+            return []
+
+        groups = self._plan_groups(files)
+        if groups:
+            self.sink.makedirs(f"{directory}/{WORK_DIR}")
+        # Microseconds keep names unique even when runs follow each other within a second
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        records = []
+        for index, group in enumerate(groups):
+            # Named after the oldest input, so it sorts where that file did
+            stem = posixpath.basename(group[0][0])[:-len(self.file_extension)]
+            name = f"{_COMPACTED_SUFFIX.sub('', stem)}_compacted_{stamp}_{index:05d}{self.file_extension}"
+            record = self._compact_group(directory, table, name, group)
+            print(f"Merged {len(group)} files of {directory} into {name} "
+                  f"({record['input_bytes']} -> {record['output_bytes']} bytes)")
+            records.append(record)
+        return records
+
+    def compact_tables(self):
+        """
+        Compact every configured table, including its partition directories.
+
+        Returns:
+            dict: Dictionary with table names as keys and status messages as values
+        """
+        results = {}
+        for table in self.tables:
+            print(f"\nCompacting {table}...")
+            try:
+                merged = 0
+                for directory in self._partition_directories(f"{self.hdfs_path}/{table}"):
+                    merged += sum(len(record['inputs']) for record in self.compact_directory(directory, table))
+                results[table] = f"Merged {merged} files" if merged else "Nothing to compact"
+            except Exception as e:
+                results[table] = f"Failed: {str(e)}"
+                print(f"✗ {table}: {results[table]}")
+        return results
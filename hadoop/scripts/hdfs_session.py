@@ -0,0 +1,173 @@
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+import uuid
+
+
+class HdfsSession:
+    def __init__(self, hdfs_container, shell='bash'):
+        """
+        Long-lived shell inside the HDFS container.
+
+        Commands are written to the shell's stdin and their completion is detected
+        through a marker line carrying the exit status, so each operation costs a
+        round trip over a pipe instead of a new ``docker exec``. Paths given to the
+        hdfs helpers are batched into a single ``hdfs dfs`` call, so several
+        directories or files only pay for one JVM start.
+
+        Args:
+            hdfs_container (str): Name of the HDFS container (Docker container name)
+            shell (str): Shell to start inside the container
+        """
+        self.hdfs_container = hdfs_container
+        self._marker = f"__hdfs_session_{uuid.uuid4().hex}__"
+        self._lock = threading.Lock()
+        self._process = subprocess.Popen(
+            ['docker', 'exec', '-i', hdfs_container, shell],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT
+        )
+
+    def _read_until_marker(self):
+        output = []
+        while True:
+            line = self._process.stdout.readline()
+            if not line:
+                raise RuntimeError(f"Shell in container {self.hdfs_container} exited unexpectedly")
+            text = line.decode(errors='replace')
+            if text.startswith(self._marker):
+                return int(text.split()[1]), ''.join(output)[:-1]
+            output.append(text)
+
+    def run(self, command):
+        """
+        Run a shell command line inside the container.
+
+        Args:
+            command (str): Command line, already quoted for the shell
+
+        Returns:
+            str: Combined stdout and stderr of the command
+
+        Raises:
+            RuntimeError: If the command exits with a non-zero status
+        """
+        with self._lock:
+            stdin = self._process.stdin
+            stdin.write(f"{command} 2>&1\n".encode())
+            # The leading newline terminates output that doesn't end in one
+            stdin.write(f"printf '\\n{self._marker} %d\\n' $?\n".encode())
+            stdin.flush()
+            status, output = self._read_until_marker()
+
+        if status != 0:
+            raise RuntimeError(f"Command failed: {command}\nError: {output}")
+        return output
+
+    def hdfs(self, *args):
+        """Run one ``hdfs dfs`` command with the given arguments."""
+        return self.run(' '.join(['hdfs', 'dfs'] + [shlex.quote(arg) for arg in args]))
+
+    def mkdir(self, *paths):
+        """Create HDFS directories (and parents) in one call."""
+        if paths:
+            self.hdfs('-mkdir', '-p', *paths)
+
+    def put(self, sources, destination, overwrite=True):
+        """Copy container-local files into HDFS in one call."""
+        self.hdfs('-put', *(['-f'] if overwrite else []), *sources, destination)
+
+    def mv(self, sources, destination):
+        """Move HDFS files in one call."""
+        self.hdfs('-mv', *sources, destination)
+
+    def rm(self, *paths, recursive=False):
+        """Remove HDFS paths (globs allowed) in one call, ignoring missing ones."""
+        if paths:
+            self.hdfs('-rm', '-f', *(['-r'] if recursive else []), *paths)
+
+    def upload(self, local_path, container_path):
+        """
+        Copy a host file into the container.
+
+        The bytes go to a ``cat`` of their own, never through the session's
+        shell: a failed redirect there would leave the file content to be run
+        as commands.
+
+        Raises:
+            RuntimeError: If the copy fails or writes fewer bytes than the file holds
+        """
+        size = os.path.getsize(local_path)
+        process = subprocess.Popen(
+            ['docker', 'exec', '-i', self.hdfs_container,
+             'sh', '-c', 'cat > "$1" && wc -c < "$1"', '_', container_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT
+        )
+        try:
+            with open(local_path, 'rb') as f:
+                shutil.copyfileobj(f, process.stdin, 1024 * 1024)
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        output = process.stdout.read().decode(errors='replace').strip()
+        if process.wait() != 0:
+            raise RuntimeError(f"Copy of {local_path} to {container_path} failed: {output}")
+        if output != str(size):
+            raise RuntimeError(f"Copy of {local_path} to {container_path} wrote {output} of {size} bytes")
+
+    def remove_local(self, *paths):
+        """Remove files from the container's local filesystem."""
+        if paths:
+            self.run(' '.join(['rm', '-f'] + [shlex.quote(path) for path in paths]))
+
+    def close(self):
+        if self._process.poll() is None:
+            try:
+                self._process.stdin.write(b"exit\n")
+                self._process.stdin.close()
+            except BrokenPipeError:
+                pass
+            self._process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class HdfsSessionPool:
+    def __init__(self, hdfs_container):
+        """
+        One HdfsSession per thread, so parallel exports don't queue behind each other.
+
+        Args:
+            hdfs_container (str): Name of the HDFS container (Docker container name)
+        """
+        self.hdfs_container = hdfs_container
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the calling thread's session, starting it on first use."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = HdfsSession(self.hdfs_container)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        """Close every session started by the pool."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
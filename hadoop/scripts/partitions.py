@@ -0,0 +1,134 @@
+import re
+from urllib.parse import unquote
+
+# Directory Hive uses for rows whose partition value is NULL
+HIVE_DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+# Characters Hive percent-encodes in partition directory names (FileUtils.escapePathName)
+_ESCAPED = re.compile(r'[\x00-\x1f"#%\'*/:=?\\\x7f{\[\]^]')
+
+
+def year_month_partitions(column, prefix='reservation'):
+    """
+    Partition spec splitting rows by the year and month of a date or timestamp column.
+
+    Args:
+        column (str): Column (or SQL expression) holding the date
+        prefix (str): Prefix of the partition column names
+
+    Returns:
+        list: ``[(f'{prefix}_year', expression), (f'{prefix}_month', expression)]``
+    """
+    return [
+        (f"{prefix}_year", f"EXTRACT(YEAR FROM {column})::int"),
+        (f"{prefix}_month", f"EXTRACT(MONTH FROM {column})::int"),
+    ]
+
+
+def column_partitions(*columns):
+    """Partition spec using the values of existing columns as they are."""
+    return [(column, column) for column in columns]
+
+
+def partition_select(spec):
+    """
+    Build the SELECT list suffix that appends a spec's partition values to every row.
+
+    Returns:
+        str: ``", expr1, expr2"``, or an empty string for an empty spec
+    """
+    return ''.join(f", {expression}" for _, expression in spec)
+
+
+def escape_partition_value(value):
+    """Render a partition value the way Hive names its directory."""
+    if value is None or value == '':
+        return HIVE_DEFAULT_PARTITION
+    return _ESCAPED.sub(lambda match: f"%{ord(match.group()):02X}", str(value))
+
+
+def partition_path(spec, values):
+    """
+    Build the relative directory of a partition, e.g. ``reservation_year=2024/reservation_month=5``.
+
+    Args:
+        spec (list): (partition_column, expression) tuples
+        values (tuple): Partition values in spec order
+
+    Returns:
+        str: Relative directory, empty for an empty spec
+    """
+    return '/'.join(f"{name}={escape_partition_value(value)}" for (name, _), value in zip(spec, values))
+
+
+def add_partition_statements(table, table_location, paths):
+    """
+    Build the Hive DDL registering partition directories with a table.
+
+    Args:
+        table (str): Hive table name
+        table_location (str): HDFS directory of the table
+        paths (list): Relative partition directories from partition_path
+
+    Returns:
+        str: One ``ALTER TABLE ... ADD IF NOT EXISTS PARTITION`` statement covering
+            all the partitions, or None if there are none
+    """
+    clauses = []
+    for path in sorted(set(paths)):
+        if not path:
+            continue
+        values = ', '.join(
+            "{}='{}'".format(name, unquote(value).replace("'", "\\'"))
+            for name, value in (part.split('=', 1) for part in path.split('/'))
+        )
+        clauses.append(f"  PARTITION ({values}) LOCATION '{table_location}/{path}'")
+    if not clauses:
+        return None
+    return f"ALTER TABLE {table} ADD IF NOT EXISTS\n" + '\n'.join(clauses) + ';'
+
+
+class PartitionRouter:
+    def __init__(self, spec, open_writer):
+        """
+        Send rows to one writer per partition.
+
+        Rows carry their partition values as trailing columns (see partition_select),
+        which are stripped before the rows are written. With an empty spec every row
+        goes to the single partition ``''``.
+
+        Args:
+            spec (list): (partition_column, expression) tuples
+            open_writer (callable): Called with a partition directory the first
+                time a row for it arrives; returns an object with write_rows and close
+        """
+        self.spec = spec
+        self.open_writer = open_writer
+        self.writers = {}
+
+    def writer(self, values=()):
+        """Return the writer of a partition, opening it on first use."""
+        path = partition_path(self.spec, values)
+        if path not in self.writers:
+            self.writers[path] = self.open_writer(path)
+        return self.writers[path]
+
+    def write_rows(self, rows):
+        if not self.spec:
+            self.writer().write_rows(rows)
+            return
+        width = len(self.spec)
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(row[-width:]), []).append(row[:-width])
+        for values, group in groups.items():
+            self.writer(values).write_rows(group)
+
+    @property
+    def partitions(self):
+        """Partition directories that received rows, sorted."""
+        return sorted(self.writers)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
@@ -0,0 +1,193 @@
+import math
+from psycopg2 import sql
+
+
+def get_columns(cursor, table_name):
+    """
+    Look up the columns of a table in the current schema.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        table_name (str): Name of the table
+
+    Returns:
+        list: (column_name, data_type) tuples in ordinal order
+    """
+    cursor.execute(
+        """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s
+        ORDER BY ordinal_position
+        """,
+        (table_name,)
+    )
+    return cursor.fetchall()
+
+
+def build_select_list(columns):
+    """
+    Build a SELECT list that renders values the way Hive's text SerDe reads them.
+
+    COPY prints booleans as ``t``/``f``, which Hive parses as NULL, so boolean
+    columns are cast to text (``true``/``false``) under their original name.
+
+    Args:
+        columns (list): (column_name, data_type) tuples from get_columns
+
+    Returns:
+        sql.Composed: Comma separated column expressions
+    """
+    expressions = []
+    for name, data_type in columns:
+        if data_type == 'boolean':
+            expressions.append(sql.SQL("{0}::text AS {0}").format(sql.Identifier(name)))
+        else:
+            expressions.append(sql.Identifier(name))
+    return sql.SQL(', ').join(expressions)
+
+
+def order_by_size(cursor, tables):
+    """
+    Order tables from largest to smallest on-disk size.
+
+    Used to schedule the longest exports first when tables run in parallel.
+    Tables missing from the catalog keep their relative order at the end.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        tables (list): Table names
+
+    Returns:
+        list: The same table names, largest first
+    """
+    cursor.execute(
+        """
+        SELECT c.relname, pg_table_size(c.oid)
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema() AND c.relname = ANY(%s)
+        """,
+        (list(tables),)
+    )
+    sizes = dict(cursor.fetchall())
+    return sorted(tables, key=lambda table: sizes.get(table, -1), reverse=True)
+
+
+def plan_ctid_ranges(cursor, table_name, rows_per_partition, max_partitions):
+    """
+    Split a table into contiguous block ranges of roughly equal size.
+
+    The row count is estimated from pg_class (reltuples/relpages scaled to the
+    current number of pages), so no table scan is needed. Tables that were never
+    analyzed, or are smaller than rows_per_partition, are not split.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        table_name (str): Name of the table
+        rows_per_partition (int): Target number of rows per range
+        max_partitions (int): Upper bound on the number of ranges
+
+    Returns:
+        list: (start_block, end_block) tuples; the last range has end_block None.
+            A single (0, None) range means the table should not be split.
+    """
+    cursor.execute(
+        """
+        SELECT c.reltuples, c.relpages,
+               pg_relation_size(c.oid) / current_setting('block_size')::int
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema() AND c.relname = %s
+        """,
+        (table_name,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return [(0, None)]
+
+    reltuples, relpages, pages = row
+    if reltuples < 0 or relpages <= 0 or pages <= 0:
+        return [(0, None)]
+
+    estimated_rows = reltuples / relpages * pages
+    partitions = min(max_partitions, pages, math.ceil(estimated_rows / rows_per_partition))
+    if partitions <= 1:
+        return [(0, None)]
+
+    step = math.ceil(pages / partitions)
+    ranges = [(start, start + step) for start in range(0, pages, step)]
+    ranges[-1] = (ranges[-1][0], None)
+    return ranges
+
+
+def ctid_range_condition(block_range):
+    """
+    Build a WHERE condition selecting the rows stored in a block range.
+
+    On PostgreSQL 14+ this is executed as a TID range scan, so each range only
+    reads its own blocks.
+
+    Args:
+        block_range (tuple): (start_block, end_block) from plan_ctid_ranges
+
+    Returns:
+        str: SQL condition, or None if the range covers the whole table
+    """
+    start, end = block_range
+    conditions = []
+    if start > 0:
+        conditions.append(f"ctid >= '({int(start)},0)'::tid")
+    if end is not None:
+        conditions.append(f"ctid < '({int(end)},0)'::tid")
+    return ' AND '.join(conditions) or None
+
+
+def get_primary_key(cursor, table_name):
+    """
+    Look up the primary key columns of a table.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        table_name (str): Name of the table
+
+    Returns:
+        list: Column names in key order, empty if the table has no primary key
+    """
+    cursor.execute(
+        """
+        SELECT a.attname
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = %s::regclass AND i.indisprimary
+        ORDER BY array_position(i.indkey::int2[], a.attnum)
+        """,
+        (table_name,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def table_fingerprint(cursor, table_name):
+    """
+    Summarize the writes a table has seen, to tell whether it changed between two runs.
+
+    Built from the table's storage file (replaced by TRUNCATE, VACUUM FULL or
+    CLUSTER) and its insert, update and delete counters in the cumulative
+    statistics, which backends report with a delay of up to a few seconds.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        table_name (str): Name of the table
+
+    Returns:
+        str: Value that stays the same as long as the table is not written to
+    """
+    cursor.execute(
+        """
+        SELECT concat_ws(':', pg_relation_filenode(c.oid), pg_stat_get_tuples_inserted(c.oid),
+                         pg_stat_get_tuples_updated(c.oid), pg_stat_get_tuples_deleted(c.oid))
+        FROM pg_class c WHERE c.oid = %s::regclass
+        """,
+        (table_name,)
+    )
+    return cursor.fetchone()[0]
@@ -0,0 +1,156 @@
+import struct
+from datetime import datetime, timedelta, timezone
+
+# Postgres timestamps count microseconds from this epoch
+_PG_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+_BOOL_OID = 16
+
+
+def format_lsn(lsn):
+    """Render an LSN the way Postgres does, e.g. ``0/16B3748``."""
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+def parse_lsn(text):
+    """Parse an LSN such as ``0/16B3748`` into an integer."""
+    high, low = text.split('/')
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+class Change:
+    def __init__(self, operation, table, values, commit_lsn, commit_time):
+        """
+        One row change of a committed transaction.
+
+        Args:
+            operation (str): 'I' insert, 'U' update, 'D' delete or 'T' truncate
+            table (str): Table name
+            values (list): Column values as text, in column order (None for NULL);
+                for deletes only the replica identity columns are set, and a
+                truncate has none
+            commit_lsn (int): End LSN of the transaction's commit record
+            commit_time (datetime): Commit timestamp
+        """
+        self.operation = operation
+        self.table = table
+        self.values = values
+        self.commit_lsn = commit_lsn
+        self.commit_time = commit_time
+
+
+class PgOutputDecoder:
+    def __init__(self):
+        """
+        Decoder of the pgoutput logical replication protocol, version 1.
+
+        Messages are fed in slot order; changes are buffered per transaction and
+        only returned by its commit message, so a batch never contains half a
+        transaction. Relation messages, sent before a table's first change in
+        every decoding session, provide the column names.
+        """
+        self.relations = {}
+        # End LSN of the last commit decoded, with or without changes to the published tables
+        self.commit_lsn = None
+        self._pending = []
+        self._commit_time = None
+
+    def columns(self, table):
+        """Column names of a table seen in a relation message, in column order."""
+        for _, name, columns, _ in self.relations.values():
+            if name == table:
+                return columns
+        return None
+
+    def feed(self, message):
+        """
+        Decode one message.
+
+        Args:
+            message (bytes): Data of one row of pg_logical_slot_peek_binary_changes
+
+        Returns:
+            list: The Change objects of a transaction when message is its commit,
+                otherwise an empty list
+        """
+        kind = message[:1]
+        if kind == b'B':
+            # final LSN, commit time, xid
+            _, micros, _ = struct.unpack_from('!QqI', message, 1)
+            self._commit_time = _PG_EPOCH + timedelta(microseconds=micros)
+            self._pending = []
+        elif kind == b'C':
+            _, _, end_lsn, _ = struct.unpack_from('!BQQq', message, 1)
+            self.commit_lsn = end_lsn
+            changes = [
+                Change(operation, table, values, end_lsn, self._commit_time)
+                for operation, table, values in self._pending
+            ]
+            self._pending = []
+            return changes
+        elif kind == b'R':
+            self._relation(message)
+        elif kind == b'I':
+            relid, = struct.unpack_from('!I', message, 1)
+            # 'N' marks the new tuple
+            values, _ = self._tuple(relid, message, 6)
+            self._pending.append(('I', self.relations[relid][1], values))
+        elif kind == b'U':
+            relid, = struct.unpack_from('!I', message, 1)
+            offset = 5
+            if message[offset:offset + 1] in (b'K', b'O'):
+                # Old key or old row, sent when the key changed or with REPLICA IDENTITY FULL
+                _, offset = self._tuple(relid, message, offset + 1)
+            values, _ = self._tuple(relid, message, offset + 1)
+            self._pending.append(('U', self.relations[relid][1], values))
+        elif kind == b'D':
+            relid, = struct.unpack_from('!I', message, 1)
+            values, _ = self._tuple(relid, message, 6)
+            self._pending.append(('D', self.relations[relid][1], values))
+        elif kind == b'T':
+            count, _ = struct.unpack_from('!IB', message, 1)
+            for relid in struct.unpack_from(f'!{count}I', message, 6):
+                self._pending.append(('T', self.relations[relid][1], []))
+        # Type ('Y'), origin ('O') and logical messages ('M') carry no row changes
+        return []
+
+    def _relation(self, message):
+        relid, = struct.unpack_from('!I', message, 1)
+        namespace, offset = _string(message, 5)
+        name, offset = _string(message, offset)
+        # replica identity setting, column count
+        _, count = struct.unpack_from('!BH', message, offset)
+        offset += 3
+        columns, type_oids = [], []
+        for _ in range(count):
+            column, offset = _string(message, offset + 1)
+            type_oid, _ = struct.unpack_from('!Ii', message, offset)
+            offset += 8
+            columns.append(column)
+            type_oids.append(type_oid)
+        self.relations[relid] = (namespace, name, columns, type_oids)
+
+    def _tuple(self, relid, message, offset):
+        type_oids = self.relations[relid][3]
+        count, = struct.unpack_from('!H', message, offset)
+        offset += 2
+        values = []
+        for index in range(count):
+            kind = message[offset:offset + 1]
+            offset += 1
+            if kind in (b't', b'b'):
+                length, = struct.unpack_from('!I', message, offset)
+                value = message[offset + 4:offset + 4 + length].decode('utf-8')
+                offset += 4 + length
+                if type_oids[index] == _BOOL_OID:
+                    # Hive's text SerDe reads true/false, not t/f
+                    value = 'true' if value == 't' else 'false'
+                values.append(value)
+            else:
+                # 'n' NULL, or 'u' an unchanged TOASTed value that was not sent
+                values.append(None)
+        return values, offset
+
+
+def _string(message, offset):
+    end = message.index(b'\0', offset)
+    return message[offset:end].decode('utf-8'), end + 1
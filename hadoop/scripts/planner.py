@@ -0,0 +1,184 @@
+from psycopg2 import sql
+
+from pg_catalog import get_primary_key
+
+# An index on updated_at only pays off while the delta is a small part of the
+# table; beyond that, reading every block sequentially is cheaper than random reads
+INDEX_DELTA_FRACTION = 0.1
+# Tables below this many rows are exported in one query whatever the plan
+SMALL_TABLE_ROWS = 100000
+
+
+class TablePlan:
+    def __init__(self, table, strategy, estimated_rows, estimated_delta, reason, missing_index=None):
+        """
+        Extraction strategy chosen for one table.
+
+        Args:
+            table (str): Table name
+            strategy (str): 'full' (every row, no watermark), 'incremental' (rows
+                past the watermark in one index-ordered query) or 'ranged' (rows
+                past the watermark, read in parallel ctid block ranges)
+            estimated_rows (float): Rows in the table per pg_class, None if unknown
+            estimated_delta (float): Rows past the watermark per pg_stats, None if unknown
+            reason (str): Why the strategy was picked
+            missing_index (str): CREATE INDEX statement that would make the
+                incremental query cheap, if the table lacks such an index
+        """
+        self.table = table
+        self.strategy = strategy
+        self.estimated_rows = estimated_rows
+        self.estimated_delta = estimated_delta
+        self.reason = reason
+        self.missing_index = missing_index
+
+    @property
+    def incremental(self):
+        return self.strategy != 'full'
+
+    def __repr__(self):
+        return f"TablePlan({self.table!r}, {self.strategy!r}, {self.reason!r})"
+
+
+def _has_column(cursor, table, column):
+    cursor.execute(
+        """
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attname = %s AND attnum > 0 AND NOT attisdropped
+        """,
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+
+def _estimated_rows(cursor, table):
+    # Same estimate as plan_ctid_ranges: reltuples scaled to the current size
+    cursor.execute(
+        """
+        SELECT c.reltuples, c.relpages, pg_relation_size(c.oid) / current_setting('block_size')::int
+        FROM pg_class c WHERE c.oid = %s::regclass
+        """,
+        (table,)
+    )
+    reltuples, relpages, pages = cursor.fetchone()
+    if reltuples < 0 or relpages <= 0:
+        return None
+    return reltuples / relpages * pages
+
+
+def _has_leading_index(cursor, table, column):
+    # Only an index whose first column is updated_at serves WHERE/ORDER BY updated_at
+    cursor.execute(
+        """
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = %s::regclass AND a.attname = %s AND i.indisvalid
+        """,
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+
+def _delta_fraction(cursor, table, column, watermark):
+    """Fraction of rows with column past watermark, from pg_stats; None without statistics"""
+    if watermark is None:
+        return 1.0
+    cursor.execute(
+        """
+        SELECT null_frac,
+               coalesce((SELECT sum(f) FROM unnest(most_common_vals::text::timestamptz[], most_common_freqs) v(b, f)
+                         WHERE b > %s), 0),
+               coalesce((SELECT sum(f) FROM unnest(most_common_freqs) f), 0),
+               (SELECT count(*) FROM unnest(histogram_bounds::text::timestamptz[]) b WHERE b > %s),
+               cardinality(histogram_bounds::text::timestamptz[])
+        FROM pg_stats
+        WHERE schemaname = current_schema() AND tablename = %s AND attname = %s
+        """,
+        (watermark, watermark, table, column)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    null_frac, common_above, common, above, bounds = row
+    if bounds:
+        # The histogram buckets hold equal shares of the rows that are neither NULL nor a common value
+        common_above += (1 - null_frac - common) * above / max(bounds - 1, 1)
+    # Statistics are samples, keep the estimate a fraction
+    return min(common_above, 1.0)
+
+
+def plan_table(cursor, table, watermark=None, partition_rows=1000000, column='updated_at'):
+    """
+    Pick the cheapest extraction strategy for a table from its catalog statistics.
+
+    - No updated_at column (e.g. the DWH dimensions): 'full'.
+    - Small tables, or an index on updated_at and a delta below
+      INDEX_DELTA_FRACTION of the rows: 'incremental', one query that the
+      index serves in key order.
+    - Otherwise the delta is read with a scan of the whole table anyway, so
+      the table is split into block ranges scanned in parallel: 'ranged'.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        table (str): Table name
+        watermark (dict): Stored watermark of the table (see watermarks), or None
+        partition_rows (int): Rows per block range of the ranged strategy; None
+            never picks it, as the exporter then runs a single query
+        column (str): Change timestamp column
+
+    Returns:
+        TablePlan
+    """
+    if not _has_column(cursor, table, column):
+        return TablePlan(table, 'full', _estimated_rows(cursor, table), None, f"no {column} column")
+
+    rows = _estimated_rows(cursor, table)
+    has_index = _has_leading_index(cursor, table, column)
+    fraction = _delta_fraction(cursor, table, column, watermark['values'][0] if watermark else None)
+    delta = rows * fraction if rows is not None and fraction is not None else None
+
+    missing_index = None
+    if not has_index and (rows is None or rows >= SMALL_TABLE_ROWS):
+        key = [column] + get_primary_key(cursor, table)
+        missing_index = sql.SQL("CREATE INDEX CONCURRENTLY ON {} ({})").format(
+            sql.Identifier(table), sql.SQL(', ').join(map(sql.Identifier, key))
+        ).as_string(cursor)
+
+    if rows is not None and rows < SMALL_TABLE_ROWS:
+        return TablePlan(table, 'incremental', rows, delta, f"small table (~{rows:.0f} rows)", missing_index)
+    if has_index and fraction is not None and fraction < INDEX_DELTA_FRACTION:
+        return TablePlan(table, 'incremental', rows, delta,
+                         f"index on {column}, ~{fraction:.1%} of the rows changed", missing_index)
+    if not partition_rows or rows is None or rows < partition_rows:
+        reason = "no statistics" if rows is None else "delta too large for the index" if has_index else f"no index on {column}"
+        split = "splitting disabled" if not partition_rows else "table too small to split"
+        return TablePlan(table, 'incremental', rows, delta, f"{reason}, {split}", missing_index)
+    if has_index:
+        reason = "no statistics on the delta" if fraction is None else f"~{fraction:.1%} of the rows changed"
+    else:
+        reason = f"no index on {column}"
+    return TablePlan(table, 'ranged', rows, delta, f"{reason}, parallel scan", missing_index)
+
+
+def missing_index_report(cursor, tables, column='updated_at'):
+    """
+    List the indexes that would make incremental extraction cheap.
+
+    Args:
+        cursor: Open psycopg2 cursor
+        tables (list): Table names
+        column (str): Change timestamp column
+
+    Returns:
+        list: CREATE INDEX CONCURRENTLY statements, one per table that has the
+            column but no index leading with it, small tables excluded
+    """
+    report = []
+    for table in tables:
+        if not _has_column(cursor, table, column):
+            continue
+        plan = plan_table(cursor, table, column=column)
+        if plan.missing_index:
+            report.append(plan.missing_index)
+    return report
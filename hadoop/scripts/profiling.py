@@ -0,0 +1,140 @@
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class _StackSampler(threading.Thread):
+    def __init__(self, thread_id, interval):
+        """Sample the call stack of one thread, counting identical stacks."""
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class TableProfiler:
+    def __init__(self, profile_dir=None, interval=0.005, top=30):
+        """
+        Opt-in CPU and memory profiles of a pipeline run, one set per table.
+
+        For every table profiled, the run directory gets:
+
+        - ``<table>.pstats``: cProfile data, for pstats, snakeviz or gprof2dot
+        - ``<table>.txt``: the top functions by cumulative and by own time
+        - ``<table>.collapsed``: sampled stacks in the collapsed format of
+          flamegraph.pl and speedscope
+        - ``<table>.memory.txt``: tracemalloc peak and top allocation sites
+
+        plus a ``summary.json`` with the wall time and memory peak per table.
+        Only the thread working on the table is profiled, not the block range
+        workers it starts. tracemalloc peaks are process wide, so they are per
+        table only when tables run one at a time (max_workers=1); from Python
+        3.12 cProfile also profiles a single table at a time, and the others
+        get sampled stacks only. With profile_dir None every method is a no-op.
+
+        Args:
+            profile_dir (str): Directory receiving one sub-directory per run, or None
+            interval (float): Seconds between two stack samples
+            top (int): Number of functions / allocation sites in the text reports
+        """
+        self.profile_dir = profile_dir
+        self.interval = interval
+        self.top = top
+        self.run_dir = None
+        self._summary = {}
+        self._lock = threading.Lock()
+        self._tracing = 0
+
+    def start_run(self, name):
+        """Create the directory of a new run, e.g. ``<profile_dir>/export_20250510_120000``."""
+        if not self.profile_dir:
+            return
+        self.run_dir = os.path.join(self.profile_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        os.makedirs(self.run_dir, exist_ok=True)
+        self._summary = {}
+
+    def finish_run(self):
+        """Write summary.json of the run."""
+        if not self.run_dir:
+            return
+        with open(os.path.join(self.run_dir, 'summary.json'), 'w') as f:
+            json.dump(self._summary, f, indent=2)
+        print(f"Profiles written to {self.run_dir}")
+
+    @contextmanager
+    def profile(self, table):
+        """Profile the block as the work of a table, see the class docstring."""
+        if not self.run_dir:
+            yield
+            return
+
+        with self._lock:
+            if self._tracing == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._tracing += 1
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+: another table's profiler is active
+            profiler = None
+        sampler = _StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+            sampler.stop()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            with self._lock:
+                self._tracing -= 1
+                if self._tracing == 0:
+                    tracemalloc.stop()
+                self._summary[table] = {'seconds': round(seconds, 3), 'peak_traced_bytes': peak}
+            self._write(table, profiler, sampler.counts, snapshot, peak)
+
+    def _write(self, table, profiler, stacks, snapshot, peak):
+        base = os.path.join(self.run_dir, table)
+        if profiler is not None:
+            profiler.dump_stats(f"{base}.pstats")
+            with open(f"{base}.txt", 'w') as f:
+                stats = pstats.Stats(profiler, stream=f).strip_dirs()
+                stats.sort_stats('cumulative').print_stats(self.top)
+                stats.sort_stats('tottime').print_stats(self.top)
+        with open(f"{base}.collapsed", 'w') as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count}\n")
+        with open(f"{base}.memory.txt", 'w') as f:
+            f.write(f"Peak traced memory: {peak / 1e6:.1f} MB\n\nLargest allocation sites still alive at the end:\n")
+            snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                f.write(f"{stat}\n")
@@ -0,0 +1,64 @@
+import csv
+import io
+
+from text_codecs import open_compressor
+
+
+class CsvWriter:
+    def __init__(self, sink, colnames, compression=None):
+        """
+        Write rows as CSV with a header line, optionally through a text codec.
+
+        Values are written the way COPY ... CSV renders them, as long as booleans
+        are selected as text (see pg_catalog.build_select_list).
+
+        Args:
+            sink: Output path, or writable binary file object (left open on close)
+            colnames (list): Column names for the header line
+            compression (str): Text codec from text_codecs, or None
+        """
+        self._file = open(sink, 'wb') if isinstance(sink, str) else None
+        out = self._file or sink
+        self._compressor = open_compressor(out, compression) if compression else None
+        self._text = io.TextIOWrapper(self._compressor or out, encoding='utf-8', newline='')
+        self._writer = csv.writer(self._text, lineterminator='\n')
+        self._writer.writerow(colnames)
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        # Flush into the compressor or sink without closing it
+        self._text.detach()
+        if self._compressor is not None:
+            self._compressor.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_row_writer(sink, description, file_format='csv', compression=None, row_group_size=100000):
+    """
+    Open a writer for rows fetched from a cursor.
+
+    Args:
+        sink: Output path or writable binary file object
+        description: cursor.description of the rows, without partition columns
+        file_format (str): 'csv', 'parquet' or 'orc'
+        compression (str): Text codec for CSV, file codec for columnar formats
+            ('snappy' if None)
+        row_group_size (int): Rows per Parquet row group / ORC write batch
+
+    Returns:
+        CsvWriter or columnar.ColumnarWriter
+    """
+    if file_format == 'csv':
+        return CsvWriter(sink, [column[0] for column in description], compression)
+    # Imported here so pyarrow is only needed when a columnar format is selected
+    from columnar import ColumnarWriter
+    return ColumnarWriter(sink, description, file_format, compression or 'snappy', row_group_size)
@@ -0,0 +1,554 @@
+import fnmatch
+import glob
+import http.client
+import io
+import json
+import os
+import posixpath
+import shutil
+import subprocess
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from hdfs_session import HdfsSessionPool
+
+
+class SinkStream(io.RawIOBase):
+    def __init__(self, buffer_size):
+        """
+        Writable binary stream into a file of a sink.
+
+        Writes are collected into chunks of ``buffer_size`` bytes before they are
+        handed to the transport, so row-sized writes (COPY emits one per row) do
+        not turn into row-sized pipe writes or HTTP chunks. Nothing is visible at
+        the destination until commit() returns; close() without commit discards.
+
+        Args:
+            buffer_size (int): Number of bytes collected before each transport write
+        """
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+        self._committed = False
+        # Bytes written so far, for the exporters' metrics
+        self.bytes_written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self.bytes_written += len(data)
+        if len(self._buffer) >= self._buffer_size:
+            self._send(bytes(self._buffer))
+            self._buffer.clear()
+        return len(data)
+
+    def commit(self):
+        """
+        Write the remaining bytes and publish the file.
+
+        Raises:
+            RuntimeError: If the transport reports a failure
+        """
+        if self._buffer:
+            self._send(bytes(self._buffer))
+            self._buffer.clear()
+        self._finish()
+        self._committed = True
+        self.close()
+
+    def close(self):
+        if not self.closed and not self._committed:
+            self._abort()
+        super().close()
+
+    def _send(self, chunk):
+        raise NotImplementedError
+
+    def _finish(self):
+        raise NotImplementedError
+
+    def _abort(self):
+        raise NotImplementedError
+
+
+class Sink:
+    """
+    Destination file system of the exporters.
+
+    Paths are absolute, slash separated paths in the sink's namespace (an HDFS
+    path for the HDFS sinks), whatever the backend. Every method raises
+    RuntimeError when the backend reports a failure.
+    """
+
+    buffer_size = 1024 * 1024
+
+    def open_stream(self, path):
+        """
+        Open a file for writing; see SinkStream for commit semantics.
+
+        Args:
+            path (str): Destination file, replaced if it exists
+
+        Returns:
+            SinkStream: Stream to write the file content to
+        """
+        raise NotImplementedError
+
+    def open_input(self, path):
+        """
+        Open a file for reading.
+
+        Args:
+            path (str): File to read
+
+        Returns:
+            Readable binary file object; close it when done
+        """
+        raise NotImplementedError
+
+    def upload(self, local_files, directory):
+        """
+        Copy local files into a directory of the sink under their own names.
+
+        Args:
+            local_files (list): Paths of files on this host
+            directory (str): Destination directory
+
+        Returns:
+            dict: Seconds spent in each step of a multi-step transfer, e.g.
+                ``{'docker_cp': 1.2, 'hdfs_put': 3.4}``; empty for a single step
+        """
+        for local_file in local_files:
+            stream = self.open_stream(posixpath.join(directory, os.path.basename(local_file)))
+            try:
+                with open(local_file, 'rb') as f:
+                    shutil.copyfileobj(f, stream, self.buffer_size)
+                stream.commit()
+            finally:
+                stream.close()
+        return {}
+
+    def makedirs(self, *paths):
+        """Create directories, including missing parents."""
+        raise NotImplementedError
+
+    def rename(self, source, destination):
+        """Move a file or directory to a new path."""
+        raise NotImplementedError
+
+    def move(self, sources, directory):
+        """
+        Move files into an existing directory under their own names.
+
+        Every file is renamed on its own, so each appears complete or not at all.
+        """
+        for source in sources:
+            self.rename(source, posixpath.join(directory, posixpath.basename(source)))
+
+    def list(self, pattern):
+        """
+        List the entries matching a path or glob.
+
+        A directory path lists the directory's entries.
+
+        Returns:
+            list: Matching paths, sorted; empty if nothing matches
+        """
+        raise NotImplementedError
+
+    def list_files(self, pattern):
+        """
+        List the files matching a path or glob, with their sizes.
+
+        Like list, but directories are left out.
+
+        Returns:
+            list: (path, size in bytes) tuples, sorted by path
+        """
+        raise NotImplementedError
+
+    def delete(self, *patterns, recursive=False):
+        """Delete the entries matching paths or globs, ignoring missing ones."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections or processes held by the sink."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _PutStream(SinkStream):
+    def __init__(self, hdfs_container, path, buffer_size):
+        super().__init__(buffer_size)
+        self.path = path
+        self._process = subprocess.Popen([
+            'docker', 'exec', '-i', hdfs_container,
+            'hdfs', 'dfs', '-put', '-f', '-', path
+        ], stdin=subprocess.PIPE, bufsize=0)
+
+    def _send(self, chunk):
+        try:
+            self._process.stdin.write(chunk)
+        except BrokenPipeError:
+            raise RuntimeError(f"hdfs dfs -put of {self.path} closed its input early")
+
+    def _finish(self):
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"hdfs dfs -put of {self.path} exited with {self._process.returncode}")
+
+    def _abort(self):
+        if self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+
+
+class _CatStream(io.RawIOBase):
+    def __init__(self, hdfs_container, path):
+        self.path = path
+        self._process = subprocess.Popen([
+            'docker', 'exec', hdfs_container,
+            'hdfs', 'dfs', '-cat', path
+        ], stdout=subprocess.PIPE)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self._process.stdout.readinto(buffer)
+        # A truncated read must not pass for the end of the file
+        if not count and self._process.wait() != 0:
+            raise RuntimeError(f"hdfs dfs -cat of {self.path} exited with {self._process.returncode}")
+        return count
+
+    def close(self):
+        if not self.closed:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.stdout.close()
+            self._process.wait()
+        super().close()
+
+
+class HdfsCliSink(Sink):
+    def __init__(self, hdfs_container, container_temp_dir, buffer_size=1024 * 1024):
+        """
+        HDFS through the ``hdfs dfs`` CLI of a Docker container.
+
+        Streams are piped into ``hdfs dfs -put -``; everything else runs over
+        persistent container sessions (see hdfs_session), one per thread. Local
+        files are staged in container_temp_dir and published with a single put.
+
+        Args:
+            hdfs_container (str): Name of the HDFS container (Docker container name)
+            container_temp_dir (str): Directory inside the container for staging files
+            buffer_size (int): Size in bytes of the chunks written into the put pipe
+        """
+        self.hdfs_container = hdfs_container
+        self.container_temp_dir = container_temp_dir.rstrip('/') or '/'
+        self.buffer_size = buffer_size
+        self.sessions = HdfsSessionPool(hdfs_container)
+
+    def open_stream(self, path):
+        return _PutStream(self.hdfs_container, path, self.buffer_size)
+
+    def open_input(self, path):
+        return io.BufferedReader(_CatStream(self.hdfs_container, path), self.buffer_size)
+
+    def upload(self, local_files, directory):
+        session = self.sessions.get()
+        container_files = [posixpath.join(self.container_temp_dir, os.path.basename(f)) for f in local_files]
+        try:
+            start = time.perf_counter()
+            session.run(f"mkdir -p {self.container_temp_dir}")
+            for local_file, container_file in zip(local_files, container_files):
+                session.upload(local_file, container_file)
+            copied = time.perf_counter()
+            session.put(container_files, directory)
+            return {'docker_cp': copied - start, 'hdfs_put': time.perf_counter() - copied}
+        finally:
+            session.remove_local(*container_files)
+
+    def makedirs(self, *paths):
+        self.sessions.get().mkdir(*paths)
+
+    def rename(self, source, destination):
+        self.sessions.get().mv([source], destination)
+
+    def move(self, sources, directory):
+        # One hdfs dfs -mv for all of them
+        if sources:
+            self.sessions.get().mv(sources, directory)
+
+    def list(self, pattern):
+        try:
+            output = self.sessions.get().hdfs('-ls', '-C', pattern)
+        except RuntimeError as e:
+            if 'No such file or directory' in str(e):
+                return []
+            raise
+        return sorted(line for line in output.splitlines() if line.startswith('/'))
+
+    def list_files(self, pattern):
+        try:
+            output = self.sessions.get().hdfs('-ls', pattern)
+        except RuntimeError as e:
+            if 'No such file or directory' in str(e):
+                return []
+            raise
+        files = []
+        for line in output.splitlines():
+            # permissions, replication, owner, group, size, date, time, path
+            fields = line.split(None, 7)
+            if len(fields) == 8 and fields[0].startswith('-'):
+                files.append((fields[7], int(fields[4])))
+        return sorted(files)
+
+    def delete(self, *patterns, recursive=False):
+        self.sessions.get().rm(*patterns, recursive=recursive)
+
+    def close(self):
+        self.sessions.close()
+
+
+class _WebHdfsStream(SinkStream):
+    def __init__(self, sink, path, temp_path, location):
+        super().__init__(sink.buffer_size)
+        self.sink = sink
+        self.path = path
+        self.temp_path = temp_path
+        url = urllib.parse.urlsplit(location)
+        connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self._connection = connection_class(url.netloc, timeout=sink.timeout)
+        # Chunked transfer encoding, so the length doesn't have to be known up front
+        self._connection.putrequest('PUT', f"{url.path}?{url.query}")
+        self._connection.putheader('Content-Type', 'application/octet-stream')
+        self._connection.putheader('Transfer-Encoding', 'chunked')
+        self._connection.endheaders()
+
+    def _send(self, chunk):
+        self._connection.send(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+
+    def _finish(self):
+        self._connection.send(b"0\r\n\r\n")
+        response = self._connection.getresponse()
+        body = response.read()
+        self._connection.close()
+        if response.status != 201:
+            raise RuntimeError(f"WebHDFS CREATE failed: {response.status} {body.decode(errors='replace')}")
+        # RENAME doesn't replace an existing file
+        self.sink.delete(self.path)
+        self.sink.rename(self.temp_path, self.path)
+
+    def _abort(self):
+        self._connection.close()
+        self.sink.delete(self.temp_path)
+
+
+class WebHdfsSink(Sink):
+    def __init__(self, url, user=None, timeout=60, buffer_size=1024 * 1024):
+        """
+        HDFS through the WebHDFS REST API of the NameNode.
+
+        No Docker or JVM is involved, so this is the cheapest transport wherever
+        the NameNode and DataNodes are reachable over HTTP.
+
+        Args:
+            url (str): NameNode HTTP address, e.g. ``http://namenode:9870``
+            user (str): HDFS user sent as ``user.name`` (simple authentication)
+            timeout (int): Socket timeout in seconds
+            buffer_size (int): Size in bytes of the HTTP chunks of a stream
+        """
+        self.url = url.rstrip('/')
+        self.user = user
+        self.timeout = timeout
+        self.buffer_size = buffer_size
+
+    def _url(self, path, op, **params):
+        params['op'] = op
+        if self.user:
+            params['user.name'] = self.user
+        return f"{self.url}/webhdfs/v1{urllib.parse.quote(path)}?{urllib.parse.urlencode(params)}"
+
+    def _request(self, method, path, op, **params):
+        request = urllib.request.Request(self._url(path, op, **params), method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"WebHDFS {op} {path} failed: {e.code} {e.read().decode(errors='replace')}")
+        return json.loads(body) if body else None
+
+    def open_stream(self, path):
+        # Written under a temp name like hdfs dfs -put does, so a failed stream never shows up as path
+        temp_path = f"{path}._COPYING_"
+        # The NameNode answers CREATE with a redirect to the DataNode that takes the data
+        url = urllib.parse.urlsplit(self._url(temp_path, 'CREATE', overwrite='true'))
+        connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(url.netloc, timeout=self.timeout)
+        try:
+            connection.request('PUT', f"{url.path}?{url.query}")
+            response = connection.getresponse()
+            body = response.read()
+        finally:
+            connection.close()
+        location = response.getheader('Location')
+        if response.status != 307 or not location:
+            raise RuntimeError(f"WebHDFS CREATE {path} failed: {response.status} {body.decode(errors='replace')}")
+        return _WebHdfsStream(self, path, temp_path, location)
+
+    def makedirs(self, *paths):
+        for path in paths:
+            self._request('PUT', path, 'MKDIRS')
+
+    def rename(self, source, destination):
+        if not self._request('PUT', source, 'RENAME', destination=destination)['boolean']:
+            raise RuntimeError(f"WebHDFS RENAME {source} -> {destination} failed")
+
+    def open_input(self, path):
+        # GET requests follow the NameNode's redirect to a DataNode on their own
+        try:
+            return urllib.request.urlopen(self._url(path, 'OPEN'), timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"WebHDFS OPEN {path} failed: {e.code} {e.read().decode(errors='replace')}")
+
+    def _list_directory(self, path):
+        try:
+            statuses = self._request('GET', path, 'LISTSTATUS')['FileStatuses']['FileStatus']
+        except RuntimeError as e:
+            if 'FileNotFoundException' in str(e):
+                return []
+            raise
+        # A file lists as itself, with an empty pathSuffix
+        return [(posixpath.join(path, status['pathSuffix']) if status['pathSuffix'] else path, status)
+                for status in statuses]
+
+    def _list_statuses(self, pattern):
+        # WebHDFS has no globbing, so only the last path component may contain wildcards
+        directory, name = posixpath.split(pattern)
+        if not glob.has_magic(name):
+            return sorted(self._list_directory(pattern), key=lambda entry: entry[0])
+        return sorted(((path, status) for path, status in self._list_directory(directory)
+                       if fnmatch.fnmatchcase(posixpath.basename(path), name)), key=lambda entry: entry[0])
+
+    def list(self, pattern):
+        return [path for path, _ in self._list_statuses(pattern)]
+
+    def list_files(self, pattern):
+        return [(path, status['length']) for path, status in self._list_statuses(pattern)
+                if status['type'] == 'FILE']
+
+    def delete(self, *patterns, recursive=False):
+        for pattern in patterns:
+            paths = self.list(pattern) if glob.has_magic(pattern) else [pattern]
+            for path in paths:
+                self._request('DELETE', path, 'DELETE', recursive=str(recursive).lower())
+
+
+class _LocalStream(SinkStream):
+    def __init__(self, path, buffer_size):
+        super().__init__(buffer_size)
+        self.path = path
+        # Same convention as hdfs dfs -put: the file only appears under its name once complete
+        self._temp_path = f"{path}._COPYING_"
+        self._file = open(self._temp_path, 'wb')
+
+    def _send(self, chunk):
+        self._file.write(chunk)
+
+    def _finish(self):
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def _abort(self):
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+
+class LocalSink(Sink):
+    def __init__(self, root, buffer_size=1024 * 1024):
+        """
+        A local directory standing in for HDFS.
+
+        Sink paths are mapped below root (``/user/hive/x`` -> ``<root>/user/hive/x``),
+        so exports can be run, benchmarked and inspected on a single machine.
+
+        Args:
+            root (str): Local directory holding the sink's files
+            buffer_size (int): Size in bytes of the writes to the local files
+        """
+        self.root = os.path.abspath(root)
+        self.buffer_size = buffer_size
+
+    def _local(self, path):
+        return os.path.join(self.root, path.lstrip('/'))
+
+    def _sink_path(self, local_path):
+        return '/' + os.path.relpath(local_path, self.root)
+
+    def open_stream(self, path):
+        return _LocalStream(self._local(path), self.buffer_size)
+
+    def open_input(self, path):
+        try:
+            return open(self._local(path), 'rb')
+        except OSError as e:
+            raise RuntimeError(f"Cannot read {path}: {e}")
+
+    def upload(self, local_files, directory):
+        for local_file in local_files:
+            destination = os.path.join(self._local(directory), os.path.basename(local_file))
+            try:
+                shutil.copyfile(local_file, f"{destination}._COPYING_")
+                os.replace(f"{destination}._COPYING_", destination)
+            except OSError as e:
+                raise RuntimeError(f"Cannot upload {local_file} to {directory}: {e}")
+        return {}
+
+    def makedirs(self, *paths):
+        for path in paths:
+            try:
+                os.makedirs(self._local(path), exist_ok=True)
+            except OSError as e:
+                raise RuntimeError(f"Cannot create {path}: {e}")
+
+    def rename(self, source, destination):
+        destination_path = self._local(destination)
+        if os.path.isdir(destination_path):
+            destination_path = os.path.join(destination_path, posixpath.basename(source))
+        try:
+            os.rename(self._local(source), destination_path)
+        except OSError as e:
+            # Same exception as the HDFS sinks, so callers can roll back whatever the backend
+            raise RuntimeError(f"Cannot rename {source} to {destination}: {e}")
+
+    def list(self, pattern):
+        path = self._local(pattern)
+        if os.path.isdir(path):
+            return sorted(self._sink_path(os.path.join(path, name)) for name in os.listdir(path))
+        return sorted(self._sink_path(match) for match in glob.glob(path))
+
+    def list_files(self, pattern):
+        return [(path, os.path.getsize(self._local(path))) for path in self.list(pattern)
+                if os.path.isfile(self._local(path))]
+
+    def delete(self, *patterns, recursive=False):
+        for pattern in patterns:
+            for match in glob.glob(self._local(pattern)):
+                if os.path.isdir(match) and not recursive:
+                    raise RuntimeError(f"{self._sink_path(match)} is a directory")
+                try:
+                    if os.path.isdir(match):
+                        shutil.rmtree(match)
+                    else:
+                        os.remove(match)
+                except OSError as e:
+                    raise RuntimeError(f"Cannot delete {self._sink_path(match)}: {e}")
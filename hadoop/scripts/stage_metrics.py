@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class CountingReader:
+    def __init__(self, f):
+        """
+        Read-through wrapper counting what is read from a file object.
+
+        Args:
+            f: Readable file object; counts are characters for text files
+        """
+        self._f = f
+        self.count = 0
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self.count += len(data)
+        return data
+
+    def readline(self, size=-1):
+        data = self._f.readline(size)
+        self.count += len(data)
+        return data
+
+
+class StageMetrics:
+    def __init__(self, pipeline, jsonl_path=None, textfile_path=None):
+        """
+        Timings, row and byte counts of the stages of a pipeline, per table.
+
+        Every recorded stage is appended to jsonl_path as one JSON line right
+        away, so a run that hangs still shows where it got to. write_textfile
+        writes the totals of the run for the node_exporter textfile collector.
+        A stage recorded several times for a table, e.g. once per block range
+        exported in parallel, is summed: its seconds are then busy time across
+        workers, not wall time.
+
+        Args:
+            pipeline (str): Name of the job, e.g. 'source_export'; the
+                ``pipeline`` label of the Prometheus series
+            jsonl_path (str): File the JSON lines are appended to, or None
+            textfile_path (str): ``.prom`` file in the collector's directory, or None
+        """
+        self.pipeline = pipeline
+        self.jsonl_path = jsonl_path
+        self.textfile_path = textfile_path
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def record(self, table, stage, seconds, rows=None, size=None):
+        """
+        Record one run of a stage.
+
+        Args:
+            table (str): Table the stage worked on
+            stage (str): Stage name, e.g. 'query', 'serialize', 'upload'
+            seconds (float): Time spent in the stage
+            rows (int): Rows handled, or None if the stage does not see rows
+            size (int): Bytes handled, or None
+        """
+        line = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'pipeline': self.pipeline, 'table': table, 'stage': stage,
+            'seconds': round(seconds, 6), 'rows': rows, 'bytes': size,
+        }
+        with self._lock:
+            totals = self._stages.setdefault(table, {}).setdefault(stage, {'seconds': 0.0, 'rows': None, 'bytes': None})
+            totals['seconds'] += seconds
+            if rows is not None:
+                totals['rows'] = (totals['rows'] or 0) + rows
+            if size is not None:
+                totals['bytes'] = (totals['bytes'] or 0) + size
+            if self.jsonl_path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.jsonl_path)), exist_ok=True)
+                with open(self.jsonl_path, 'a') as f:
+                    f.write(json.dumps(line) + '\n')
+
+    @contextmanager
+    def stage(self, table, stage):
+        """
+        Time a block as a stage; the block sets counts on the yielded dict.
+
+        Nothing is recorded when the block raises.
+
+        Example:
+            with metrics.stage('flights', 'upload') as counts:
+                counts['bytes'] = upload(...)
+        """
+        counts = {'rows': None, 'bytes': None}
+        start = time.perf_counter()
+        yield counts
+        self.record(table, stage, time.perf_counter() - start, counts['rows'], counts['bytes'])
+
+    def table(self, table):
+        """
+        Totals of a table's stages, with throughput where counts are known.
+
+        Returns:
+            dict: {stage: {'seconds', 'rows', 'bytes', 'rows_per_s', 'mb_per_s'}}
+        """
+        with self._lock:
+            stages = {stage: dict(totals) for stage, totals in self._stages.get(table, {}).items()}
+        for totals in stages.values():
+            seconds = totals['seconds']
+            totals['seconds'] = round(seconds, 6)
+            if totals['rows'] is not None:
+                totals['rows_per_s'] = round(totals['rows'] / seconds, 1) if seconds else None
+            if totals['bytes'] is not None:
+                totals['mb_per_s'] = round(totals['bytes'] / 1e6 / seconds, 3) if seconds else None
+        return stages
+
+    def write_textfile(self, succeeded=None):
+        """
+        Write the run's totals in the Prometheus text format, if textfile_path is set.
+
+        The file is replaced atomically, so the collector never reads half of it.
+
+        Args:
+            succeeded (dict): {table: bool} outcome of each table, exported as
+                pipeline_table_success
+        """
+        if not self.textfile_path:
+            return
+        series = {
+            'pipeline_stage_seconds': ('gauge', 'Seconds spent in a stage of the last run', 'seconds'),
+            'pipeline_stage_rows': ('gauge', 'Rows handled by a stage of the last run', 'rows'),
+            'pipeline_stage_bytes': ('gauge', 'Bytes handled by a stage of the last run', 'bytes'),
+        }
+        with self._lock:
+            stages = {table: {stage: dict(totals) for stage, totals in table_stages.items()}
+                      for table, table_stages in self._stages.items()}
+
+        lines = []
+        for name, (kind, description, key) in series.items():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+            for table, table_stages in sorted(stages.items()):
+                for stage, totals in sorted(table_stages.items()):
+                    if totals[key] is not None:
+                        lines.append(f'{name}{{{self._labels(table=table, stage=stage)}}} {totals[key]}')
+        if succeeded is not None:
+            lines += ["# HELP pipeline_table_success Whether the table succeeded in the last run",
+                      "# TYPE pipeline_table_success gauge"]
+            for table, ok in sorted(succeeded.items()):
+                lines.append(f'pipeline_table_success{{{self._labels(table=table)}}} {int(bool(ok))}')
+        lines += ["# HELP pipeline_last_run_timestamp_seconds End of the last run",
+                  "# TYPE pipeline_last_run_timestamp_seconds gauge",
+                  f'pipeline_last_run_timestamp_seconds{{{self._labels()}}} {time.time():.3f}']
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.textfile_path)), exist_ok=True)
+        temp_path = f"{self.textfile_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, self.textfile_path)
+
+    def _labels(self, **labels):
+        labels = {'pipeline': self.pipeline, **labels}
+        return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,108 @@
+import bz2
+import gzip
+import io
+from contextlib import contextmanager
+
+# Codec name -> extension Hadoop's CompressionCodecFactory uses to pick the decompressor
+TEXT_CODEC_EXTENSIONS = {
+    'gzip': '.gz',
+    'bzip2': '.bz2',
+    'zstd': '.zst',
+}
+
+# gzip at 6 and zstd at 3 are the usual speed/ratio points; bzip2 is slow at any level
+DEFAULT_LEVELS = {
+    'gzip': 6,
+    'bzip2': 9,
+    'zstd': 3,
+}
+
+
+def text_extension(codec):
+    """
+    Return the file name suffix of a text codec.
+
+    Hive's text input format decompresses files by this suffix, so it must be
+    the last part of the file name (``part-00000.csv.gz``).
+
+    Args:
+        codec (str): 'gzip', 'bzip2', 'zstd', or None for uncompressed text
+
+    Returns:
+        str: Suffix including the dot, empty for None
+    """
+    if codec is None:
+        return ''
+    if codec not in TEXT_CODEC_EXTENSIONS:
+        raise ValueError(f"Unsupported text codec: {codec}")
+    return TEXT_CODEC_EXTENSIONS[codec]
+
+
+def open_compressor(out, codec, level=None):
+    """
+    Wrap a writable binary stream in a streaming compressor.
+
+    Closing the returned writer writes the codec's trailer but leaves ``out``
+    open. bzip2 output is splittable by Hadoop; gzip and zstd files are read by a
+    single mapper each, so keep them to part-file size.
+
+    Args:
+        out: Writable binary file object (a sink stream or a local file)
+        codec (str): 'gzip', 'bzip2' or 'zstd'
+        level (int): Compression level, the codec's default from DEFAULT_LEVELS if None
+
+    Returns:
+        Writable binary file object
+    """
+    text_extension(codec)
+    if level is None:
+        level = DEFAULT_LEVELS[codec]
+    if codec == 'gzip':
+        # mtime=0 so re-exports of unchanged data produce identical files
+        return gzip.GzipFile(fileobj=out, mode='wb', compresslevel=level, mtime=0)
+    if codec == 'bzip2':
+        return bz2.BZ2File(out, 'wb', compresslevel=level)
+    # Imported here so zstandard is only needed when zstd is selected
+    import zstandard
+    return zstandard.ZstdCompressor(level=level).stream_writer(out, closefd=False)
+
+
+def open_decompressor(source, codec):
+    """
+    Wrap a readable binary stream in a streaming decompressor.
+
+    Args:
+        source: Readable binary file object
+        codec (str): 'gzip', 'bzip2', 'zstd', or None to read ``source`` as is
+
+    Returns:
+        Readable, line-iterable binary file object
+    """
+    if codec is None:
+        return source
+    text_extension(codec)
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=source, mode='rb')
+    if codec == 'bzip2':
+        return bz2.BZ2File(source, 'rb')
+    import zstandard
+    # The zstd reader has no readline of its own
+    return io.BufferedReader(
+        zstandard.ZstdDecompressor().stream_reader(source, read_across_frames=True, closefd=False)
+    )
+
+
+@contextmanager
+def compressed(out, codec, level=None):
+    """
+    Context manager yielding ``out`` itself (codec None) or a compressor over it.
+
+    The compressor is only finished when the block completes normally; after an
+    error the partial output is left for the caller to discard.
+    """
+    if codec is None:
+        yield out
+        return
+    writer = open_compressor(out, codec, level)
+    yield writer
+    writer.close()
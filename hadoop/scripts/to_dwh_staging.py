@@ -1,4 +1,7 @@
+import os
 from EL_dwh import PostgresToHdfsExporter
+from stage_metrics import StageMetrics
+from partitions import column_partitions
 
 # Configuration
 PG_CONFIG = {
@@ -21,6 +24,17 @@ TABLES = [
 HDFS_PATH = '/user/hive/warehouse/staging/dwh'
 HDFS_CONTAINER = 'master1'
 CONTAINER_TEMP_DIR = '/tmp/csv_staging'
+MAX_WORKERS = 4
+# Tables to write as Hive partition directories, matching the PARTITIONED BY of their staging DDL
+PARTITION_BY = {
+    'fact_reservations': column_partitions('reservation_year', 'reservation_month')
+}
+
+# Per-stage timings as JSON lines, and for the node_exporter textfile collector (None to skip)
+METRICS_LOG = 'logs/dwh_export_metrics.jsonl'
+PROMETHEUS_TEXTFILE = None  # e.g. '/var/lib/node_exporter/textfile/dwh_export.prom'
+# Set PIPELINE_PROFILE_DIR to write per-table CPU / memory profiles of the run there
+PROFILE_DIR = os.environ.get('PIPELINE_PROFILE_DIR')
 
 # Create exporter instance
 exporter = PostgresToHdfsExporter(
@@ -28,7 +42,12 @@ exporter = PostgresToHdfsExporter(
     hdfs_path=HDFS_PATH,
     tables=TABLES,
     hdfs_container= HDFS_CONTAINER,
-    container_temp_dir = CONTAINER_TEMP_DIR
+    container_temp_dir = CONTAINER_TEMP_DIR,
+    streaming = True,
+    max_workers = MAX_WORKERS,
+    partition_by = PARTITION_BY,
+    metrics = StageMetrics('dwh_export', METRICS_LOG, PROMETHEUS_TEXTFILE),
+    profile_dir = PROFILE_DIR
 )
 
 # Export tables
@@ -36,4 +55,10 @@ results = exporter.export_tables()
 
 # Print results
 for table, status in results.items():
-    print(f"{table}: {status}")
\ No newline at end of file
+    print(f"{table}: {status}")
+    for stage, totals in exporter.metrics.table(table).items():
+        print(f"    {stage}: {totals['seconds']:.2f}s, {totals.get('rows_per_s') or '-'} rows/s, {totals.get('mb_per_s') or '-'} MB/s")
+
+# Register the partitions written by this run with Hive
+for statement in exporter.add_partition_statements():
+    print(statement)
\ No newline at end of file
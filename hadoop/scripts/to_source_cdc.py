@@ -0,0 +1,49 @@
+from cdc import CdcExporter
+
+# Configuration
+PG_CONFIG = {
+    'host' : 'localhost',
+    'port' : 5432,
+    'dbname' : 'source',
+    'user' : 'user',
+    'password' : 'password'
+}
+TABLES = [
+    'aircraft',
+    'airports',
+    'fare_basis_codes',
+    'flights',
+    'passengers',
+    'promotions',
+    'reservations',
+    'sales_channels'
+]
+HDFS_PATH = '/user/hive/warehouse/staging/source_changes'
+HDFS_CONTAINER = 'master1'
+CONTAINER_TEMP_DIR = '/tmp/csv_staging'
+# Needs wal_level = logical on the server; the slot holds WAL until the next run
+SLOT_NAME = 'hive_cdc_source'
+PUBLICATION = 'hive_cdc_source'
+MAX_CHANGES = 1000000
+
+# Create exporter instance
+exporter = CdcExporter(
+    pg_config=PG_CONFIG,
+    hdfs_path=HDFS_PATH,
+    tables=TABLES,
+    hdfs_container= HDFS_CONTAINER,
+    container_temp_dir = CONTAINER_TEMP_DIR,
+    slot_name = SLOT_NAME,
+    publication = PUBLICATION,
+    max_changes = MAX_CHANGES
+)
+
+# Creates the publication and slot on the first run only
+exporter.setup()
+
+# Export the changes since the last run
+results = exporter.export_changes()
+
+# Print results
+for table, status in results.items():
+    print(f"{table}: {status}")
\ No newline at end of file
@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+from datetime import date, datetime
+
+
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)) or value is None:
+        return value
+    return str(value)
+
+
+class WatermarkStore:
+    def __init__(self, path, legacy_dir=None):
+        """
+        High-water marks for incremental extraction, kept in a single JSON file.
+
+        Each table maps to the key of the last row that was exported, e.g.
+        ``(updated_at, reservation_id)``. The file is rewritten through a temp file
+        and os.replace, so a crash never leaves a half-written store behind.
+
+        Args:
+            path (str): Location of the JSON file
+            legacy_dir (str): Directory holding the old ``<table>_last_extract.txt``
+                files, used for tables that have no watermark in the store yet
+        """
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def get(self, table):
+        """
+        Return the watermark of a table.
+
+        Returns:
+            dict: ``{'key_columns': [...], 'values': [...]}``, or None if the table
+                has never been exported incrementally
+        """
+        with self._lock:
+            watermark = self._read().get(table)
+        if watermark is not None or self.legacy_dir is None:
+            return watermark
+
+        legacy_file = os.path.join(self.legacy_dir, f"{table}_last_extract.txt")
+        if os.path.exists(legacy_file):
+            with open(legacy_file, 'r') as f:
+                return {'key_columns': ['updated_at'], 'values': [f.read().strip()]}
+        return None
+
+    def set(self, table, key_columns, values):
+        """Record the key of the last exported row of a table."""
+        with self._lock:
+            watermarks = self._read()
+            watermarks[table] = {
+                'key_columns': list(key_columns),
+                'values': [_to_json(value) for value in values],
+                'exported_at': datetime.utcnow().isoformat(),
+            }
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(watermarks, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)